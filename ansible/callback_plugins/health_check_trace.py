@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Callback de instrumentação do OpenShift Health Check.
+# Registra a duração de cada task por host (visão do controlador), agrupada por
+# estágio (collect / analyze / report), em um arquivo JSONL por host. O role
+# report_generator combina esses spans com os eventos remotos de trace_exec.py
+# (RSS, bytes, objetos) e gera o trace no formato Chrome Trace Event.
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: health_check_trace
+    type: aggregate
+    short_description: Spans de tempo por task para o trace de execução do health check
+    description:
+      - Grava um span (JSON por linha) para cada task executada em cada host.
+      - O arquivo de cada host é recriado no início de cada execução do playbook.
+    requirements:
+      - habilitar em callbacks_enabled no ansible.cfg
+    options:
+      trace_dir:
+        description:
+          - Diretório no controlador onde os spans são gravados.
+          - Se não definido, usa <diretório do playbook>/../reports/traces.
+        env:
+          - name: HEALTH_CHECK_TRACE_DIR
+        ini:
+          - section: callback_health_check_trace
+            key: trace_dir
+'''
+
+import json
+import os
+import resource
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+# Role -> estágio do pipeline
+STAGES = {
+    'data_collector': 'collect',
+    'architecture_analyzer': 'analyze',
+    'security_analyzer': 'analyze',
+    'best_practices_analyzer': 'analyze',
+    'resource_optimizer': 'analyze',
+    'report_generator': 'report',
+}
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'health_check_trace'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._trace_dir = None
+        self._starts = {}
+        self._opened = set()
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self._trace_dir = self.get_option('trace_dir')
+
+    def v2_playbook_on_start(self, playbook):
+        if not self._trace_dir:
+            self._trace_dir = os.path.join(playbook._basedir, '..', 'reports', 'traces')
+        self._trace_dir = os.path.abspath(self._trace_dir)
+        try:
+            os.makedirs(self._trace_dir, exist_ok=True)
+        except OSError as e:
+            self._display.warning('health_check_trace: não foi possível criar %s: %s' % (self._trace_dir, e))
+            self._trace_dir = None
+
+    def v2_runner_on_start(self, host, task):
+        self._starts[(host.get_name(), task._uuid)] = time.time()
+
+    def _record(self, result, status):
+        if not self._trace_dir:
+            return
+        host = result._host.get_name()
+        task = result._task
+        start = self._starts.pop((host, task._uuid), None)
+        if start is None:
+            return
+        end = time.time()
+        role = task._role.get_name() if task._role else ''
+        span = {
+            'name': task.get_name(),
+            'cat': STAGES.get(role, 'setup'),
+            'role': role,
+            'action': task.action,
+            'status': status,
+            'ts': int(start * 1e6),
+            'dur': int((end - start) * 1e6),
+            # ru_maxrss é monotônico: mostra o crescimento de memória do controlador
+            'controller_maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        # Tasks copy/template retornam o tamanho gravado; slurp retorna o conteúdo lido
+        res = result._result
+        if isinstance(res.get('size'), int):
+            span['bytes_written'] = res['size']
+        if isinstance(res.get('content'), str) and res.get('encoding') == 'base64':
+            span['bytes_read'] = len(res['content']) * 3 // 4
+        path = os.path.join(self._trace_dir, '%s.spans.jsonl' % host)
+        mode = 'a' if host in self._opened else 'w'
+        try:
+            with open(path, mode) as fp:
+                fp.write(json.dumps(span, separators=(',', ':')) + '\n')
+            self._opened.add(host)
+        except OSError as e:
+            self._display.warning('health_check_trace: falha ao gravar %s: %s' % (path, e))
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, 'failed')
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, 'unreachable')
+
+    def v2_runner_on_skipped(self, result):
+        self._starts.pop((result._host.get_name(), result._task._uuid), None)
@@ -9,6 +9,8 @@ set -e
 ANSIBLE_PLAYBOOK="playbooks/openshift_health_check.yml"
 INVENTORY="inventory/hosts.yml"
 REPORTS_DIR="reports"
+FLEET_REPORT="roles/report_generator/files/fleet_report.py"
+FLEET_DIR="$REPORTS_DIR/fleet"
 
 # Cores para output
 RED='\033[0;31m'
@@ -27,12 +29,14 @@ show_help() {
     echo "  -l, --list              Listar clusters disponíveis"
     echo "  -d, --dry-run           Executar em modo dry-run"
     echo "  -v, --verbose           Executar em modo verbose"
+    echo "  -f, --fleet             Gerar apenas o painel da frota com as últimas execuções"
     echo ""
     echo "EXEMPLOS:"
     echo "  $0                                    # Executar em todos os clusters"
     echo "  $0 -c production-cluster             # Executar apenas no cluster de produção"
     echo "  $0 -c staging-cluster -v             # Executar no staging com verbose"
     echo "  $0 -d                                # Dry-run em todos os clusters"
+    echo "  $0 -f                                # Painel da frota em $FLEET_DIR"
     echo ""
     echo "CONFIGURAÇÃO:"
     echo "  Configure os clusters no arquivo: inventory/hosts.yml"
@@ -89,6 +93,23 @@ run_health_check() {
     fi
 }
 
+# Função para gerar o painel da frota (última execução de cada cluster)
+build_fleet_report() {
+    echo -e "${BLUE}Gerando painel da frota${NC}"
+
+    if [ ! -d "$REPORTS_DIR" ]; then
+        echo -e "${YELLOW}Diretório de relatórios não encontrado: $REPORTS_DIR${NC}"
+        return 1
+    fi
+
+    if python3 "$FLEET_REPORT" "$REPORTS_DIR" --out "$FLEET_DIR"; then
+        echo -e "${BLUE}Painel da frota: $FLEET_DIR/fleet_report.html${NC}"
+    else
+        echo -e "${RED}✗ Falha ao gerar o painel da frota${NC}"
+        return 1
+    fi
+}
+
 # Função para executar em todos os clusters
 run_all_clusters() {
     local dry_run="$1"
@@ -131,6 +152,12 @@ run_all_clusters() {
     if [ -d "$REPORTS_DIR" ]; then
         ls -la "$REPORTS_DIR" | grep -E "^d.*_[0-9]{8}_[0-9]{6}$"
     fi
+
+    # Painel único com todos os clusters
+    if [ "$dry_run" != "true" ]; then
+        echo ""
+        build_fleet_report || true
+    fi
 }
 
 # Função para limpar relatórios antigos
@@ -204,6 +231,10 @@ while [[ $# -gt 0 ]]; do
             VERBOSE="true"
             shift
             ;;
+        -f|--fleet)
+            build_fleet_report
+            exit $?
+            ;;
         --cleanup)
             cleanup_old_reports "$2"
             exit 0
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Índice de topologia dos workloads no host remoto.
+
+Uso:
+  workload_topology.py build <data_collection_dir> --index <topology_index.json> --out <resumo.json>
+  workload_topology.py query <topology_index.json> owner-chain|service-pods|route-pods <ns/nome|uid>
+  workload_topology.py query <topology_index.json> orphans
+
+build: lê deployments.json, services.json e pods.json uma única vez e monta, a partir de
+ownerReferences e label selectors, mapas por UID e por namespace+selector:
+- objects: uid -> tipo, namespace, nome e dono (controller);
+- children: uid -> uids dos objetos que ele controla;
+- selectors: "<ns>|<hash do selector>" -> pods selecionados (cada selector é resolvido
+  uma vez, por interseção do índice de labels dos pods, e reaproveitado);
+- service_pods (endpoints -> pods, ou selector quando não há endpoints),
+  route_services e ingress_services.
+Com isso cadeia de donos, service -> endpoints -> pods e objetos órfãos saem por consulta
+direta em dicionário, sem varreduras aninhadas. O índice completo fica no remoto; ao
+controlador vai só o resumo (contagens, órfãos limitados a 50 e questões).
+"""
+import hashlib
+import json
+import os
+import sys
+
+MAX_LISTED = 50
+WORKLOAD_KEYS = (("deployments_json", "Deployment"), ("replicasets_json", "ReplicaSet"),
+                 ("daemonsets_json", "DaemonSet"), ("statefulsets_json", "StatefulSet"),
+                 ("jobs_json", "Job"), ("cronjobs_json", "CronJob"))
+NETWORK_KEYS = (("services_json", "Service"), ("endpoints_json", "Endpoints"),
+                ("routes_json", "Route"), ("ingresses_json", "Ingress"))
+# Workloads que devem ter pods quando spec.replicas > 0
+SCALED_KINDS = ("Deployment", "StatefulSet")
+MIRROR_ANNOTATION = "kubernetes.io/config.mirror"
+
+
+def load_items(path, key):
+    """Itens de data[key] aceitando dict {"items": [...]} ou string JSON (formato antigo)."""
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    result = {}
+    for name, _ in key:
+        value = data.get(name) if isinstance(data, dict) else None
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = None
+        result[name] = value.get("items", []) if isinstance(value, dict) else []
+    return result
+
+
+def ref(kind, ns, name):
+    return "%s/%s/%s" % (kind, ns, name)
+
+
+def selector_key(ns, selector):
+    raw = json.dumps(sorted(selector.items()), separators=(",", ":"))
+    return "%s|%s" % (ns, hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12])
+
+
+class TopologyBuilder(object):
+    def __init__(self):
+        self.objects = {}
+        self.by_name = {}
+        self.children = {}
+        self.labels = {}
+        self.selectors = {}
+        self.service_pods = {}
+        self.service_ready = {}
+        self.route_services = {}
+        self.ingress_services = {}
+        self.dangling = []
+        self.selector_lookups = 0
+        self.pending_owners = []
+        self.specs = {}
+
+    def add(self, kind, obj):
+        meta = obj.get("metadata") or {}
+        ns, name = meta.get("namespace", ""), meta.get("name", "")
+        uid = meta.get("uid") or ref(kind, ns, name)
+        owners = meta.get("ownerReferences") or []
+        owner = next((o for o in owners if o.get("controller")), owners[0] if owners else None)
+        record = {"kind": kind, "ns": ns, "name": name}
+        if owner:
+            record["owner"] = owner.get("uid")
+            self.pending_owners.append((uid, owner))
+        self.objects[uid] = record
+        self.by_name[ref(kind, ns, name)] = uid
+        return uid, meta
+
+    def add_pod(self, pod):
+        uid, meta = self.add("Pod", pod)
+        ns = meta.get("namespace", "")
+        record = self.objects[uid]
+        record["phase"] = (pod.get("status") or {}).get("phase", "")
+        if MIRROR_ANNOTATION in (meta.get("annotations") or {}):
+            record["mirror"] = True
+        for key, value in (meta.get("labels") or {}).items():
+            self.labels.setdefault((ns, key, value), set()).add(uid)
+
+    def select(self, ns, selector):
+        """Pods de <ns> que casam com o selector (matchLabels), resolvido uma vez por chave."""
+        key = selector_key(ns, selector)
+        self.selector_lookups += 1
+        if key not in self.selectors:
+            sets = sorted((self.labels.get((ns, k, v), set()) for k, v in selector.items()), key=len)
+            pods = set(sets[0]).intersection(*sets[1:]) if sets else set()
+            self.selectors[key] = sorted(pods)
+        return key
+
+    def link_owners(self):
+        for uid, owner in self.pending_owners:
+            if owner.get("uid") in self.objects:
+                self.children.setdefault(owner["uid"], []).append(uid)
+            elif owner.get("kind") in dict(WORKLOAD_KEYS).values():
+                # Dono de tipo indexado que não existe mais: objeto órfão
+                self.dangling.append(uid)
+        self.pending_owners = []
+
+    def link_services(self, services, endpoints):
+        endpoint_pods = {}
+        for ep in endpoints:
+            meta = ep.get("metadata") or {}
+            ready, not_ready = [], []
+            for subset in ep.get("subsets") or []:
+                for address in subset.get("addresses") or []:
+                    ready.append((address.get("targetRef") or {}).get("uid"))
+                for address in subset.get("notReadyAddresses") or []:
+                    not_ready.append((address.get("targetRef") or {}).get("uid"))
+            endpoint_pods[(meta.get("namespace", ""), meta.get("name", ""))] = (ready, not_ready)
+        for svc in services:
+            meta = svc.get("metadata") or {}
+            ns, name = meta.get("namespace", ""), meta.get("name", "")
+            uid = self.by_name[ref("Service", ns, name)]
+            selector = (svc.get("spec") or {}).get("selector") or {}
+            if not selector:
+                continue
+            self.specs[uid] = self.select(ns, selector)
+            ready, not_ready = endpoint_pods.get((ns, name), (None, []))
+            if ready is None:
+                pods = self.selectors[self.specs[uid]]
+                ready = pods
+            else:
+                pods = [p for p in ready + not_ready if p in self.objects]
+            self.service_pods[uid] = pods
+            self.service_ready[uid] = len([p for p in ready if p in self.objects])
+
+    def link_routes(self, routes, ingresses):
+        for route in routes:
+            meta = route.get("metadata") or {}
+            ns = meta.get("namespace", "")
+            spec = route.get("spec") or {}
+            backends = [spec.get("to") or {}] + (spec.get("alternateBackends") or [])
+            names = [b.get("name") for b in backends if b.get("name") and b.get("kind", "Service") == "Service"]
+            self.route_services[self.by_name[ref("Route", ns, meta.get("name", ""))]] = \
+                [self.by_name.get(ref("Service", ns, n), ref("Service", ns, n)) for n in names]
+        for ing in ingresses:
+            meta = ing.get("metadata") or {}
+            ns = meta.get("namespace", "")
+            spec = ing.get("spec") or {}
+            backends = [spec.get("defaultBackend") or spec.get("backend") or {}]
+            for rule in spec.get("rules") or []:
+                backends.extend(p.get("backend") or {} for p in (rule.get("http") or {}).get("paths") or [])
+            names = set()
+            for backend in backends:
+                name = (backend.get("service") or {}).get("name") or backend.get("serviceName")
+                if name:
+                    names.add(name)
+            self.ingress_services[self.by_name[ref("Ingress", ns, meta.get("name", ""))]] = \
+                [self.by_name.get(ref("Service", ns, n), ref("Service", ns, n)) for n in sorted(names)]
+
+    def descendant_pods(self, uid, memo):
+        if uid not in memo:
+            total = 0
+            for child in self.children.get(uid, []):
+                total += 1 if self.objects[child]["kind"] == "Pod" else self.descendant_pods(child, memo)
+            memo[uid] = total
+        return memo[uid]
+
+    def index(self, replicas):
+        memo = {}
+        orphans = {
+            "dangling_owner": sorted(self.dangling),
+            "unmanaged_pods": sorted(uid for uid, o in self.objects.items()
+                                     if o["kind"] == "Pod" and "owner" not in o and not o.get("mirror")),
+            "workloads_without_pods": sorted(uid for uid, count in replicas.items()
+                                             if count > 0 and self.descendant_pods(uid, memo) == 0),
+            "services_without_pods": sorted(uid for uid, pods in self.service_pods.items() if not pods),
+            "services_without_ready_endpoints": sorted(uid for uid, pods in self.service_pods.items()
+                                                       if pods and self.service_ready.get(uid, 0) == 0),
+            "routes_to_missing_service": sorted(uid for uid, svcs in list(self.route_services.items())
+                                                + list(self.ingress_services.items())
+                                                if any(s not in self.objects for s in svcs)),
+        }
+        return {
+            "version": 1,
+            "objects": self.objects,
+            "by_name": self.by_name,
+            "children": self.children,
+            "selectors": self.selectors,
+            "service_selector": self.specs,
+            "service_pods": self.service_pods,
+            "route_services": self.route_services,
+            "ingress_services": self.ingress_services,
+            "orphans": orphans,
+        }
+
+
+class TopologyIndex(object):
+    """Consultas O(1) (por salto) sobre o índice gravado por build."""
+
+    def __init__(self, data):
+        self.data = data
+        self.objects = data["objects"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fp:
+            return cls(json.load(fp))
+
+    def resolve(self, key, kind):
+        if key in self.objects:
+            return key
+        ns, _, name = key.partition("/")
+        return self.data["by_name"].get(ref(kind, ns, name))
+
+    def describe(self, uid):
+        obj = self.objects.get(uid)
+        return ref(obj["kind"], obj["ns"], obj["name"]) if obj else uid
+
+    def owner_chain(self, uid):
+        chain = []
+        while uid in self.objects and uid not in chain:
+            chain.append(uid)
+            uid = self.objects[uid].get("owner")
+        return chain
+
+    def service_pods(self, uid):
+        return self.data["service_pods"].get(uid, [])
+
+    def route_pods(self, uid):
+        services = self.data["route_services"].get(uid) or self.data["ingress_services"].get(uid, [])
+        pods = []
+        for svc in services:
+            pods.extend(self.service_pods(svc))
+        return pods
+
+    def orphans(self):
+        return self.data["orphans"]
+
+
+def build(data_dir, index_path, out_path):
+    workloads = load_items(os.path.join(data_dir, "deployments.json"), WORKLOAD_KEYS)
+    network = load_items(os.path.join(data_dir, "services.json"), NETWORK_KEYS)
+    pods = load_items(os.path.join(data_dir, "pods.json"), (("pods_json", "Pod"),))
+
+    builder = TopologyBuilder()
+    replicas = {}
+    for key, kind in WORKLOAD_KEYS:
+        for obj in workloads.get(key, []):
+            uid, _ = builder.add(kind, obj)
+            if kind in SCALED_KINDS:
+                replicas[uid] = int((obj.get("spec") or {}).get("replicas", 1) or 0)
+    for pod in pods.get("pods_json", []):
+        builder.add_pod(pod)
+    for key, kind in NETWORK_KEYS:
+        for obj in network.get(key, []):
+            builder.add(kind, obj)
+    builder.link_owners()
+    builder.link_services(network.get("services_json", []), network.get("endpoints_json", []))
+    builder.link_routes(network.get("routes_json", []), network.get("ingresses_json", []))
+    index = builder.index(replicas)
+
+    tmp = index_path + ".tmp"
+    with open(tmp, "w") as fp:
+        json.dump(index, fp, separators=(",", ":"))
+    os.replace(tmp, index_path)
+
+    topology = TopologyIndex(index)
+    counts = {}
+    for obj in index["objects"].values():
+        counts[obj["kind"]] = counts.get(obj["kind"], 0) + 1
+    orphans = index["orphans"]
+    routes_without_pods = sorted(uid for uid in list(index["route_services"]) + list(index["ingress_services"])
+                                 if not topology.route_pods(uid))
+    summary = {
+        "objects_by_kind": counts,
+        "orphan_counts": dict((name, len(uids)) for name, uids in orphans.items()),
+        "orphans": dict((name, [topology.describe(uid) for uid in uids[:MAX_LISTED]])
+                        for name, uids in orphans.items()),
+        "routes_without_pods": [topology.describe(uid) for uid in routes_without_pods[:MAX_LISTED]],
+        "index": {"objects": len(index["objects"]), "selectors": len(index["selectors"]),
+                  "selector_lookups": builder.selector_lookups, "path": index_path},
+        "issues": [],
+    }
+    summary["orphan_counts"]["routes_without_pods"] = len(routes_without_pods)
+    messages = (("services_without_pods", "%d services com selector que não seleciona nenhum pod"),
+                ("services_without_ready_endpoints", "%d services sem endpoints prontos"),
+                ("routes_to_missing_service", "%d rotas/ingresses apontando para service inexistente"),
+                ("routes_without_pods", "%d rotas/ingresses sem pods por trás"),
+                ("workloads_without_pods", "%d deployments/statefulsets com réplicas e nenhum pod"),
+                ("dangling_owner", "%d objetos cujo dono (ownerReference) não existe mais"),
+                ("unmanaged_pods", "%d pods sem controlador (não serão recriados se falharem)"))
+    for name, message in messages:
+        if summary["orphan_counts"].get(name):
+            summary["issues"].append(message % summary["orphan_counts"][name])
+    with open(out_path, "w") as fp:
+        json.dump(summary, fp, indent=2, ensure_ascii=False)
+
+
+def query(index_path, what, key):
+    topology = TopologyIndex.load(index_path)
+    if what == "orphans":
+        result = dict((name, [topology.describe(uid) for uid in uids]) for name, uids in topology.orphans().items())
+    elif what == "owner-chain":
+        result = [topology.describe(uid) for uid in topology.owner_chain(topology.resolve(key, "Pod"))]
+    elif what == "service-pods":
+        result = [topology.describe(uid) for uid in topology.service_pods(topology.resolve(key, "Service"))]
+    else:
+        uid = topology.resolve(key, "Route") or topology.resolve(key, "Ingress")
+        result = [topology.describe(uid) for uid in topology.route_pods(uid)]
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) == 6 and args[0] == "build" and args[2] == "--index" and args[4] == "--out":
+        build(args[1], args[3], args[5])
+        return
+    if len(args) >= 3 and args[0] == "query" and (args[2] == "orphans" or len(args) == 4) \
+            and args[2] in ("owner-chain", "service-pods", "route-pods", "orphans"):
+        query(args[1], args[2], args[3] if len(args) == 4 else None)
+        return
+    print("Usage: workload_topology.py build <data_collection_dir> --index <topology_index.json> --out <resumo.json>\n"
+          "       workload_topology.py query <topology_index.json> owner-chain|service-pods|route-pods <ns/nome|uid>\n"
+          "       workload_topology.py query <topology_index.json> orphans", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Empacota os helpers remotos das roles em um único zipapp (health_helpers-<hash>.pyz).
+
+Uso:
+  build_helpers.py build --roles <dir das roles> --out-dir <dir>
+  build_helpers.py benchmark --roles <dir das roles> [--runs 15]
+
+build: roda no controlador. Junta os scripts de files/ das roles, compila cada um para
+.pyc ao lado do .py (zipimport não usa __pycache__; com outra versão do Python no remoto
+o .py é usado) e grava o zipapp com um __main__.py que só importa o helper pedido:
+  python3 health_helpers-<hash>.pyz <helper> [args...]
+O arquivo é determinístico (ordem e datas fixas), então o hash no nome identifica o
+conteúdo e o remoto só recebe o bundle quando ele muda. Imprime {name, path, sha256}.
+
+benchmark: mede a partida a frio de cada helper chamado de verdade, como script avulso
+(`python3 <helper>.py`, que o Python recompila a cada chamada) e pelo zipapp
+(`python3 health_helpers-<hash>.pyz <helper>`), com os mesmos argumentos (--help) e em
+um diretório temporário vazio (helpers sem argparse não encontram entradas e saem logo).
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import py_compile
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+# Subcomando -> script (relativo ao diretório das roles)
+HELPERS = [
+    ("trace_exec", "data_collector/files/trace_exec.py"),
+    ("scoped_get", "data_collector/files/scoped_get.py"),
+    ("resource_registry", "data_collector/files/resource_registry.py"),
+    ("merge_operators_json", "data_collector/files/merge_operators_json.py"),
+    ("merge_security_configs_json", "data_collector/files/merge_security_configs_json.py"),
+    ("summarize_operators", "architecture_analyzer/files/summarize_operators.py"),
+    ("workload_topology", "architecture_analyzer/files/workload_topology.py"),
+    ("secrets_hygiene", "security_analyzer/files/secrets_hygiene.py"),
+    ("node_packing", "resource_optimizer/files/node_packing.py"),
+    ("report_sources", "report_generator/files/report_sources.py"),
+    ("trend_store", "report_generator/files/trend_store.py"),
+    ("build_execution_trace", "report_generator/files/build_execution_trace.py"),
+    ("health_watch", "health_watcher/files/health_watch.py"),
+]
+BUNDLE_PREFIX = "health_helpers-"
+SHEBANG = b"#!/usr/bin/env python3\n"
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+MAIN = '''# Gerado por build_helpers.py: despacha o subcomando e importa só o helper pedido.
+import sys
+
+HELPERS = %r
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in HELPERS:
+        sys.stderr.write("Usage: %%s <helper> [args...]\\nHelpers: %%s\\n" %% (sys.argv[0], ", ".join(HELPERS)))
+        sys.exit(2)
+    name = sys.argv[1]
+    sys.argv = [name + ".py"] + sys.argv[2:]
+    __import__(name).main()
+
+
+main()
+'''
+
+
+def compiled(source, name):
+    """Bytecode do módulo (pyc com hash não verificado: independe da data do arquivo)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, name + ".py")
+        with open(src, "w") as fp:
+            fp.write(source)
+        cfile = os.path.join(tmp, name + ".pyc")
+        py_compile.compile(src, cfile=cfile, dfile=name + ".py", doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        with open(cfile, "rb") as fp:
+            return fp.read()
+
+
+def bundle_bytes(roles_dir):
+    modules = [("__main__", MAIN % [name for name, _ in HELPERS])]
+    for name, rel_path in HELPERS:
+        with open(os.path.join(roles_dir, rel_path)) as fp:
+            modules.append((name, fp.read()))
+    buf = io.BytesIO()
+    buf.write(SHEBANG)
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, source in sorted(modules):
+            for arcname, data in ((name + ".py", source.encode("utf-8")), (name + ".pyc", compiled(source, name))):
+                info = zipfile.ZipInfo(arcname, ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                zf.writestr(info, data)
+    return buf.getvalue()
+
+
+def build(roles_dir, out_dir):
+    data = bundle_bytes(roles_dir)
+    sha = hashlib.sha256(data).hexdigest()
+    name = "%s%s.pyz" % (BUNDLE_PREFIX, sha[:16])
+    path = os.path.join(os.path.abspath(out_dir), name)
+    if not os.path.exists(path):
+        os.makedirs(out_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fp:
+            fp.write(data)
+        os.chmod(tmp, 0o755)
+        os.replace(tmp, path)
+        # Bundles de versões anteriores no controlador
+        for old in os.listdir(out_dir):
+            if old.startswith(BUNDLE_PREFIX) and old.endswith(".pyz") and old != name:
+                try:
+                    os.unlink(os.path.join(out_dir, old))
+                except OSError:
+                    pass
+    return {"name": name, "path": path, "sha256": sha}
+
+
+def timed(command, runs, cwd=None):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        # Código de saída ignorado: só interessa o tempo até o helper terminar
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(roles_dir, runs):
+    out_dir = tempfile.mkdtemp(prefix="helpers_bench_")
+    try:
+        bundle = build(roles_dir, out_dir)
+        python = sys.executable
+        work_dir = os.path.join(out_dir, "cwd")
+        os.makedirs(work_dir)
+        baseline = timed([python, "-c", "pass"], runs)
+        print("Bundle: %s (%d KB)" % (bundle["name"], os.path.getsize(bundle["path"]) // 1024))
+        print("Partida a frio (mediana de %d execuções, ms); interpretador vazio: %.1f" % (runs, baseline))
+        print("%-28s %10s %10s" % ("helper", "script", "zipapp"))
+        totals = [0.0, 0.0]
+        for name, rel_path in HELPERS:
+            old = timed([python, os.path.abspath(os.path.join(roles_dir, rel_path)), "--help"], runs, work_dir)
+            new = timed([python, bundle["path"], name, "--help"], runs, work_dir)
+            totals[0] += old
+            totals[1] += new
+            print("%-28s %10.1f %10.1f" % (name, old, new))
+        print("%-28s %10.1f %10.1f" % ("total", totals[0], totals[1]))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle zipapp dos helpers remotos")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build")
+    p_build.add_argument("--roles", required=True)
+    p_build.add_argument("--out-dir", required=True)
+    p_bench = sub.add_parser("benchmark")
+    p_bench.add_argument("--roles", required=True)
+    p_bench.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(json.dumps(build(args.roles, args.out_dir)))
+        return
+    benchmark(args.roles, args.runs)
+
+
+if __name__ == "__main__":
+    main()
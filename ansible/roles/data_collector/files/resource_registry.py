@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Registro de recursos da execução: cada listagem do cluster é buscada uma única vez.
+
+Uso:
+  resource_registry.py declare --cache <dir> --spec <comandos.json>
+  resource_registry.py fetch --cache <dir> -- <comando> [args...]
+
+declare: recebe a lista de comandos declarados pelos coletores habilitados (um item
+por coletor que usa o recurso) e grava quantos consumidores cada listagem terá.
+
+fetch: devolve no stdout a saída do comando. A primeira chamada executa o comando e
+guarda a saída em <dir> (somente leitura, 0444); as seguintes leem o arquivo. Um lock
+por listagem (fcntl) faz chamadas concorrentes esperarem a busca em andamento em vez
+de repeti-la. Quando o último consumidor declarado lê a listagem o arquivo é apagado,
+para não manter em disco mais do que o necessário (bastions com /tmp pequeno).
+
+Algumas variações são derivadas localmente da listagem base, sem nova chamada à API:
+- `adm top pods --sort-by=cpu|memory`: ordena a saída de `adm top pods`;
+- `get events --field-selector type=<T>` ou `lastTimestamp>=<data>`: filtra `get events`.
+"""
+import fcntl
+import hashlib
+import os
+import re
+import shutil
+import sys
+
+# json, shlex e subprocess são importados só nos caminhos que os usam: a maioria das
+# chamadas de fetch apenas lê uma listagem já em cache.
+
+DERIVED_FIELD_RE = re.compile(r"^(type)=(\w+)$|^(lastTimestamp)>=(\S+)$")
+QUANTITY_RE = re.compile(r"^([0-9.]+)([a-zA-Z]*)$")
+SUFFIXES = {"": 1, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12,
+            "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40}
+
+
+def split_derived(argv):
+    """Separa o comando base (buscado na API) da variação derivada localmente."""
+    base, derive = [], None
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if "top" in argv and (arg == "--sort-by" or arg.startswith("--sort-by=")):
+            value, step = (arg.split("=", 1)[1], 1) if "=" in arg else (argv[i + 1], 2)
+            derive = ("sort", value)
+            i += step
+            continue
+        if "events" in argv and (arg == "--field-selector" or arg.startswith("--field-selector=")):
+            value, step = (arg.split("=", 1)[1], 1) if arg != "--field-selector" else (argv[i + 1], 2)
+            if DERIVED_FIELD_RE.match(value):
+                derive = ("field", value)
+                i += step
+                continue
+        base.append(arg)
+        i += 1
+    return base, derive
+
+
+def cache_key(base):
+    return hashlib.sha1("\0".join(base).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_quantity(value):
+    match = QUANTITY_RE.match(value.strip())
+    if not match or match.group(2) not in SUFFIXES:
+        return 0.0
+    return float(match.group(1)) * SUFFIXES[match.group(2)]
+
+
+def sort_table(path, column, out):
+    with open(path) as fp:
+        lines = fp.read().splitlines()
+    if not lines:
+        return
+    header = lines[0].split()
+    prefix = column.upper()
+    index = next((i for i, name in enumerate(header) if name.upper().startswith(prefix)), None)
+    rows = [line for line in lines[1:] if line.strip()]
+    if index is not None:
+        rows.sort(key=lambda line: parse_quantity((line.split() + [""] * len(header))[index]), reverse=True)
+    out.write("\n".join([lines[0]] + rows) + "\n")
+
+
+def filter_events(path, selector, out):
+    import json
+    match = DERIVED_FIELD_RE.match(selector)
+    with open(path) as fp:
+        try:
+            data = json.load(fp)
+        except ValueError:
+            data = {"apiVersion": "v1", "items": [], "kind": "List", "metadata": {"resourceVersion": ""}}
+    if match.group(1):
+        items = [e for e in data.get("items", []) if e.get("type") == match.group(2)]
+    else:
+        since = match.group(4)
+        items = [e for e in data.get("items", []) if (e.get("lastTimestamp") or e.get("eventTime") or "") >= since]
+    data["items"] = items
+    out.write(json.dumps(data, indent=4) + "\n")
+
+
+def read_int(path, default):
+    try:
+        with open(path) as fp:
+            return int(fp.read().strip() or default)
+    except (OSError, ValueError):
+        return default
+
+
+def write_int(path, value):
+    with open(path, "w") as fp:
+        fp.write("%d\n" % value)
+
+
+def fetch(cache, argv):
+    base, derive = split_derived(argv)
+    key = os.path.join(cache, cache_key(base))
+    out_path, rc_path, refs_path = key + ".out", key + ".rc", key + ".refs"
+    with open(key + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if os.path.exists(out_path):
+            rc = read_int(rc_path, 0)
+        else:
+            import subprocess
+            tmp_path = key + ".tmp"
+            with open(tmp_path, "wb") as tmp:
+                try:
+                    rc = subprocess.call(base, stdout=tmp)
+                except OSError as e:
+                    print("resource_registry: %s: %s" % (base[0], e), file=sys.stderr)
+                    rc = 127
+            os.chmod(tmp_path, 0o444)
+            os.rename(tmp_path, out_path)
+            write_int(rc_path, rc)
+
+        sink = sys.stdout
+        if derive and derive[0] == "sort":
+            sort_table(out_path, derive[1], sink)
+        elif derive:
+            filter_events(out_path, derive[1], sink)
+        else:
+            sink.flush()
+            with open(out_path, "rb") as fp:
+                shutil.copyfileobj(fp, sys.stdout.buffer)
+        sink.flush()
+
+        remaining = read_int(refs_path, 1) - 1
+        if remaining > 0:
+            write_int(refs_path, remaining)
+        else:
+            for path in (out_path, rc_path, refs_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+    return rc
+
+
+def declare(cache, spec_path):
+    import json
+    import shlex
+    with open(spec_path) as fp:
+        commands = json.load(fp)
+    counts = {}
+    for command in commands:
+        base, _ = split_derived(shlex.split(command))
+        counts[cache_key(base)] = counts.get(cache_key(base), 0) + 1
+    for key, count in counts.items():
+        write_int(os.path.join(cache, key + ".refs"), count)
+    print("Listagens declaradas: %d (%d consumidores)" % (len(counts), len(commands)))
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) >= 3 and args[1] == "--cache":
+        cache = args[2]
+        if not os.path.isdir(cache):
+            os.makedirs(cache, exist_ok=True)
+        if args[0] == "declare" and len(args) == 5 and args[3] == "--spec":
+            declare(cache, args[4])
+            return
+        if args[0] == "fetch" and len(args) > 4 and args[3] == "--":
+            sys.exit(fetch(cache, args[4:]))
+    print("Usage: resource_registry.py declare --cache <dir> --spec <comandos.json>\n"
+          "       resource_registry.py fetch --cache <dir> -- <comando> [args...]", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Executa um comando `oc`/`kubectl` em uma lista de namespaces (modo direcionado).
+
+Uso: scoped_get.py --cli <oc|kubectl> --namespaces <ns1,ns2,...> [--by-name] -- <args...>
+
+Substitui `<cli> <args...> --all-namespaces`: roda `<cli> <args...> -n <ns>` para
+cada namespace em paralelo e junta as saídas no stdout, no mesmo formato que o
+comando original produziria:
+- `-o json`: uma única List com os itens de todos os namespaces (indentação de 4
+  espaços, como o oc, para que o trace_exec.py continue contando objetos);
+- saída tabular (ex.: `adm top pods`): um cabeçalho seguido das linhas de cada
+  namespace; com --sort-by a ordenação vale dentro de cada namespace.
+
+Com --by-name o namespace é passado como nome do objeto (`get namespaces <ns>`),
+para buscar os próprios namespaces/projects; os objetos retornados entram na List.
+
+Namespaces inexistentes ou sem permissão geram aviso no stderr e são ignorados;
+o código de saída só é diferente de zero se todos falharem.
+"""
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8
+
+
+def parse_args(argv):
+    if "--" not in argv:
+        return None
+    split = argv.index("--")
+    opts, command = argv[:split], argv[split + 1:]
+    by_name = "--by-name" in opts
+    if by_name:
+        opts.remove("--by-name")
+    values = dict(zip(opts[0::2], opts[1::2]))
+    if "--cli" not in values or "--namespaces" not in values or not command:
+        return None
+    namespaces = [ns.strip() for ns in values["--namespaces"].split(",") if ns.strip()]
+    return values["--cli"], namespaces, by_name, command
+
+
+def run_in_namespace(cli, command, namespace, by_name):
+    if by_name:
+        # `get namespaces -o json` -> `get namespaces <ns> -o json`
+        argv = [cli] + command[:2] + [namespace] + command[2:]
+    else:
+        argv = [cli] + command + ["-n", namespace]
+    proc = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return namespace, proc.returncode, proc.stdout, proc.stderr
+
+
+def merge_json(outputs):
+    items = []
+    for _, stdout in outputs:
+        try:
+            data = json.loads(stdout)
+        except ValueError:
+            continue
+        if "items" in data:
+            items.extend(data["items"])
+        else:
+            items.append(data)
+    merged = {"apiVersion": "v1", "items": items, "kind": "List", "metadata": {"resourceVersion": ""}}
+    return json.dumps(merged, indent=4) + "\n"
+
+
+def merge_table(outputs):
+    header = None
+    rows = []
+    for _, stdout in outputs:
+        lines = stdout.decode("utf-8", "replace").splitlines()
+        if not lines:
+            continue
+        header = header or lines[0]
+        rows.extend(lines[1:])
+    if header is None:
+        return ""
+    return "\n".join([header] + rows) + "\n"
+
+
+def main():
+    parsed = parse_args(sys.argv[1:])
+    if parsed is None:
+        print("Usage: scoped_get.py --cli <oc|kubectl> --namespaces <ns1,ns2,...> [--by-name] -- <args...>",
+              file=sys.stderr)
+        sys.exit(2)
+    cli, namespaces, by_name, command = parsed
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, max(len(namespaces), 1))) as pool:
+        results = list(pool.map(lambda ns: run_in_namespace(cli, command, ns, by_name), namespaces))
+
+    outputs = []
+    for namespace, rc, stdout, stderr in results:
+        if rc != 0:
+            message = stderr.decode("utf-8", "replace").strip()
+            print("scoped_get: %s: %s" % (namespace, message), file=sys.stderr)
+            continue
+        if stdout.strip():
+            outputs.append((namespace, stdout))
+
+    wants_json = "json" in command or "-ojson" in command or "--output=json" in command
+    sys.stdout.write(merge_json(outputs) if wants_json else merge_table(outputs))
+    if results and all(rc != 0 for _, rc, _, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Executa um comando no host remoto e registra um evento de trace (JSON por linha).
+
+Uso: trace_exec.py --out <events.jsonl> -- <comando> [args...]
+
+O stdout do comando é repassado sem alteração (pode ser redirecionado para arquivo
+pelo shell), então o wrapper pode prefixar qualquer chamada `oc get ...` ou script
+Python sem mudar o comportamento da task. Para cada execução registra tempo de
+parede, pico de RSS, bytes lidos/escritos, bytes de saída e contagem de objetos.
+O código de saída do comando é preservado.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+CHUNK = 1024 * 1024
+# Em `oc get ... -o json` (List indentada com 4 espaços) cada item abre em uma
+# linha com exatamente 8 espaços; contar esse marcador evita fazer parse do JSON.
+ITEM_MARKER = b"\n        {\n"
+# Scripts que apenas repassam um comando do CLI (registro de recursos, modo direcionado)
+FETCH_WRAPPERS = ("resource_registry.py", "scoped_get.py")
+
+
+def read_proc_io(pid):
+    """Lê /proc/<pid>/io (acumula filhos já finalizados). Retorna {} se indisponível."""
+    out = {}
+    try:
+        with open("/proc/%d/io" % pid) as fp:
+            for line in fp:
+                key, _, val = line.partition(":")
+                out[key.strip()] = int(val)
+    except (OSError, ValueError):
+        pass
+    return out
+
+
+def script_argv(argv):
+    """Chamada pelo bundle de helpers (`python3 health_helpers-<hash>.pyz node_packing ...`)
+    vira a forma de script avulso (`python3 node_packing.py ...`)."""
+    if len(argv) > 2 and os.path.basename(argv[0]).startswith("python") and argv[1].endswith(".pyz"):
+        return [argv[0], argv[2] + ".py"] + argv[3:]
+    return argv
+
+
+def wrapped_command(argv):
+    """Comando do CLI dentro dos wrappers, ex.: `python3 resource_registry.py fetch ... --
+    python3 scoped_get.py --cli oc ... -- get pods` -> ['oc', 'get', 'pods']."""
+    argv = script_argv(argv)
+    if len(argv) < 2 or os.path.basename(argv[1]) not in FETCH_WRAPPERS or "--" not in argv:
+        return None
+    split = argv.index("--")
+    inner = argv[split + 1:]
+    if os.path.basename(argv[1]) == "scoped_get.py":
+        options = argv[:split]
+        inner = [options[options.index("--cli") + 1] if "--cli" in options else "oc"] + inner
+    return wrapped_command(inner) or inner
+
+
+def event_name(argv):
+    """Nome legível do evento: 'oc get pods' ou nome do script Python."""
+    argv = wrapped_command(argv) or script_argv(argv)
+    prog = os.path.basename(argv[0])
+    if prog in ("oc", "kubectl"):
+        words = []
+        for arg in argv[1:]:
+            if arg.startswith("-"):
+                break
+            words.append(arg)
+        return " ".join([prog] + words)
+    if prog.startswith("python") and len(argv) > 1:
+        return os.path.basename(argv[1])
+    return prog
+
+
+def event_category(argv):
+    argv = wrapped_command(argv) or argv
+    return "fetch" if os.path.basename(argv[0]) in ("oc", "kubectl") else "script"
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 4 or args[0] != "--out" or args[2] != "--":
+        print("Usage: trace_exec.py --out <events.jsonl> -- <command> [args...]", file=sys.stderr)
+        sys.exit(2)
+    out_path = args[1]
+    argv = args[3:]
+
+    start = time.time()
+    try:
+        proc = subprocess.Popen(argv, stdout=subprocess.PIPE)
+    except OSError as e:
+        print("trace_exec: %s: %s" % (argv[0], e), file=sys.stderr)
+        sys.exit(127)
+    bytes_out = 0
+    items = 0
+    lines = 0
+    first = b""
+    tail = b""
+    sink = sys.stdout.buffer
+    while True:
+        chunk = proc.stdout.read(CHUNK)
+        if not chunk:
+            break
+        if not first:
+            first = chunk[:64]
+        window = tail + chunk
+        items += window.count(ITEM_MARKER)
+        tail = window[-(len(ITEM_MARKER) - 1):]
+        lines += chunk.count(b"\n")
+        bytes_out += len(chunk)
+        sink.write(chunk)
+    sink.flush()
+    proc.stdout.close()
+
+    # Espera sem colher o processo para ainda conseguir ler /proc/<pid>/io
+    try:
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+    except (AttributeError, OSError):
+        pass
+    io = read_proc_io(proc.pid)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else (status >> 8)
+    end = time.time()
+
+    if not bytes_out:
+        objects = None
+    elif first.lstrip().startswith(b"{"):
+        objects = items
+    else:
+        # Saída tabular (ex.: `oc adm top`): uma linha por objeto após o cabeçalho
+        objects = max(lines - 1, 0)
+    event = {
+        "name": event_name(argv),
+        "cat": event_category(argv),
+        "ts": int(start * 1e6),
+        "dur": int((end - start) * 1e6),
+        "args": {
+            "command": " ".join(argv),
+            "rc": proc.returncode,
+            "peak_rss_kb": usage.ru_maxrss,
+            "bytes_read": io.get("rchar", usage.ru_inblock * 512),
+            "bytes_written": io.get("wchar", usage.ru_oublock * 512),
+            "bytes_out": bytes_out,
+            "objects": objects,
+        },
+    }
+    try:
+        with open(out_path, "a") as fp:
+            fp.write(json.dumps(event, separators=(",", ":")) + "\n")
+    except OSError as e:
+        print("trace_exec: não foi possível gravar evento: %s" % e, file=sys.stderr)
+    sys.exit(proc.returncode)
+
+
+if __name__ == "__main__":
+    main()
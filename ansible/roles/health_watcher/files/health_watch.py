@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Modo contínuo (watch) do health check no bastion.
+
+Uso:
+  health_watch.py run --config <watch_config.json>
+  health_watch.py status --dir <watch_dir>
+  health_watch.py stop --dir <watch_dir>
+
+run: para cada recurso usado pelos analisadores mantém um cache em memória no estilo
+informer: list paginado (`oc get --raw <api>?limit=500`) seguido de watch a partir do
+resourceVersion da lista (`?watch=1&allowWatchBookmarks=true`); se o resourceVersion
+expirar (410 Gone) refaz o list. A cada mudança o arquivo de dados correspondente
+(mesmo formato de data_collection/) é marcado como sujo; após `debounce` segundos sem
+novas mudanças (ou `max_delay` segundos desde a primeira mudança pendente, com mudanças
+contínuas) os arquivos sujos são regravados e só os analisadores que dependem deles
+são executados de novo. O resumo mais recente fica em <dir>/latest_summary.json e,
+opcionalmente, em http://<bind>/summary (e /healthz com o estado dos caches).
+
+Recursos sem permissão ou inexistentes no cluster (403/404 no list, ex.: machines sem
+cluster-admin, routes fora do OpenShift) ficam com cache vazio, como na coleta com
+failed_when: false, e aparecem como "unavailable" no estado dos caches.
+
+No modo direcionado os watches continuam no cluster inteiro e os objetos fora dos
+namespaces alvo são descartados ao chegar (um watch por recurso, não por namespace).
+"""
+import argparse
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+# recurso -> (caminho na API, Kind, namespaced)
+RESOURCES = {
+    "nodes": ("/api/v1/nodes", "Node", False),
+    "machines": ("/apis/machine.openshift.io/v1beta1/machines", "Machine", True),
+    "pods": ("/api/v1/pods", "Pod", True),
+    "services": ("/api/v1/services", "Service", True),
+    "endpoints": ("/api/v1/endpoints", "Endpoints", True),
+    "routes": ("/apis/route.openshift.io/v1/routes", "Route", True),
+    "ingresses": ("/apis/networking.k8s.io/v1/ingresses", "Ingress", True),
+    "deployments": ("/apis/apps/v1/deployments", "Deployment", True),
+    "replicasets": ("/apis/apps/v1/replicasets", "ReplicaSet", True),
+    "daemonsets": ("/apis/apps/v1/daemonsets", "DaemonSet", True),
+    "statefulsets": ("/apis/apps/v1/statefulsets", "StatefulSet", True),
+    "jobs": ("/apis/batch/v1/jobs", "Job", True),
+    "cronjobs": ("/apis/batch/v1/cronjobs", "CronJob", True),
+    "secrets": ("/api/v1/secrets", "Secret", True),
+    "configmaps": ("/api/v1/configmaps", "ConfigMap", True),
+    "serviceaccounts": ("/api/v1/serviceaccounts", "ServiceAccount", True),
+}
+
+# arquivo de data_collection/ -> chave no arquivo -> recurso
+FILES = {
+    "nodes.json": {"nodes_json": "nodes", "machines": "machines"},
+    "pods.json": {"pods_json": "pods"},
+    "services.json": {"services_json": "services", "routes_json": "routes",
+                      "ingresses_json": "ingresses", "endpoints_json": "endpoints"},
+    "deployments.json": {"deployments_json": "deployments", "replicasets_json": "replicasets",
+                         "daemonsets_json": "daemonsets", "statefulsets_json": "statefulsets",
+                         "jobs_json": "jobs", "cronjobs_json": "cronjobs"},
+    "security_configs.json": {"secrets_json": "secrets", "configmaps_json": "configmaps"},
+    "rbac.json": {"serviceaccounts_json": "serviceaccounts"},
+}
+
+# analisador -> (script, arquivos de entrada, argumentos, arquivo de resumo); {data} = dir dos dados.
+# Com "helpers" na configuração (bundle health_helpers-<hash>.pyz) o analisador roda como
+# subcomando do bundle; sem ele, como script em <dir>.
+ANALYZERS = {
+    "workload_topology": ("workload_topology.py", ("deployments.json", "services.json", "pods.json"),
+                          ["build", "{data}", "--index", "{data}/topology_index.json",
+                           "--out", "{data}/topology_summary.json"], "topology_summary.json"),
+    "node_packing": ("node_packing.py", ("nodes.json", "pods.json"),
+                     ["{data}", "--out", "{data}/node_packing_summary.json"], "node_packing_summary.json"),
+    "secrets_hygiene": ("secrets_hygiene.py", ("security_configs.json", "pods.json", "rbac.json"),
+                        ["{data}/security_configs.json", "--pods", "{data}/pods.json", "--rbac", "{data}/rbac.json",
+                         "--out", "{data}/secrets_hygiene_summary.json"], "secrets_hygiene_summary.json"),
+}
+
+LIST_PAGE = 500
+WATCH_TIMEOUT = 1800
+MAX_BACKOFF = 60
+# Erros do list que não se resolvem com nova tentativa: o recurso fica vazio
+UNAVAILABLE_ERRORS = ("Forbidden", "NotFound", "(403)", "(404)", "the server could not find the requested resource")
+
+
+def write_json(path, data, **kwargs):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fp:
+        json.dump(data, fp, **kwargs)
+    os.replace(tmp, path)
+
+
+class Informer(threading.Thread):
+    """list + watch de um recurso; entrega eventos na fila compartilhada."""
+
+    def __init__(self, name, cli, events, stop):
+        threading.Thread.__init__(self, name="informer-%s" % name)
+        self.daemon = True
+        self.resource = name
+        self.path, self.kind, _ = RESOURCES[name]
+        self.cli, self.events, self.stop = cli, events, stop
+        self.proc = None
+        self.state = {"relists": 0, "watch_restarts": 0, "resource_version": None, "error": None,
+                      "unavailable": None}
+
+    def raw(self, query):
+        return self.cli + ["get", "--raw", "%s?%s" % (self.path, query)]
+
+    def list_all(self):
+        items, token = [], ""
+        while True:
+            query = "limit=%d" % LIST_PAGE + ("&continue=%s" % token if token else "")
+            proc = subprocess.run(self.raw(query), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if proc.returncode != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args, proc.stdout, proc.stderr)
+            output = proc.stdout
+            page = json.loads(output.decode("utf-8"))
+            for item in page.get("items", []):
+                item.setdefault("kind", self.kind)
+            items.extend(page.get("items", []))
+            token = (page.get("metadata") or {}).get("continue")
+            if not token:
+                return items, (page.get("metadata") or {}).get("resourceVersion")
+
+    def run(self):
+        rv, backoff = None, 1
+        while not self.stop.is_set():
+            try:
+                if rv is None:
+                    items, rv = self.list_all()
+                    self.state["relists"] += 1
+                    self.events.put((self.resource, "SYNC", items))
+                rv = self.watch(rv)
+                backoff = 1
+            except subprocess.CalledProcessError as e:
+                stderr = (e.stderr or b"").decode("utf-8", "replace").strip()
+                if rv is None and any(marker in stderr for marker in UNAVAILABLE_ERRORS):
+                    # Sem permissão ou API ausente: sincronizado vazio, sem novas tentativas
+                    self.state["unavailable"] = stderr.splitlines()[-1] if stderr else str(e)
+                    self.events.put((self.resource, "SYNC", []))
+                    return
+                self.state["error"] = stderr or str(e)
+                rv = None
+                self.stop.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+            except (OSError, ValueError) as e:
+                self.state["error"] = str(e)
+                rv = None
+                self.stop.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def watch(self, rv):
+        """Segue o watch até o timeout do servidor; devolve o rv para continuar (None = relist)."""
+        query = "watch=1&allowWatchBookmarks=true&timeoutSeconds=%d&resourceVersion=%s" % (WATCH_TIMEOUT, rv)
+        self.proc = subprocess.Popen(self.raw(query), stdout=subprocess.PIPE)
+        self.state["watch_restarts"] += 1
+        self.state["error"] = None
+        try:
+            for line in self.proc.stdout:
+                if not line.strip():
+                    continue
+                event = json.loads(line.decode("utf-8"))
+                obj = event.get("object") or {}
+                if event.get("type") == "ERROR":
+                    # Ex.: 410 Gone (resourceVersion antigo demais): refazer o list
+                    return None
+                rv = (obj.get("metadata") or {}).get("resourceVersion") or rv
+                self.state["resource_version"] = rv
+                if event.get("type") != "BOOKMARK":
+                    obj.setdefault("kind", self.kind)
+                    self.events.put((self.resource, event.get("type"), obj))
+        finally:
+            self.proc.stdout.close()
+            self.proc.wait()
+        return rv if self.proc.returncode == 0 else None
+
+    def terminate(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+
+
+class Watcher(object):
+    def __init__(self, config):
+        self.config = config
+        self.dir = config["dir"]
+        self.data_dir = os.path.join(self.dir, "data_collection")
+        self.namespaces = set(config.get("namespaces") or [])
+        self.debounce = float(config.get("debounce", 5))
+        # Com mudanças contínuas (pods, endpoints) o debounce nunca expira: limite de espera
+        self.max_delay = float(config.get("max_delay") or 6 * self.debounce)
+        self.helpers = config.get("helpers")
+        self.analyzers = config.get("analyzers") or dict((name, []) for name in ANALYZERS)
+        self.caches = dict((name, {}) for name in self.needed_resources())
+        self.synced = set()
+        self.dirty = set()
+        self.last_change = 0.0
+        self.first_change = 0.0
+        self.events = queue.Queue()
+        self.stop = threading.Event()
+        self.informers = [Informer(name, config["cli"], self.events, self.stop) for name in self.caches]
+        self.summary = {"cluster": config.get("cluster"), "started_at": self.now(), "cycles": 0, "analyzers": {}}
+        self.summary_path = os.path.join(self.dir, "latest_summary.json")
+
+    @staticmethod
+    def now():
+        return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def needed_resources(self):
+        files = set()
+        for name in self.analyzers:
+            files.update(ANALYZERS[name][1])
+        return sorted(set(r for f in files for r in FILES[f].values()))
+
+    def keep(self, resource, obj):
+        if not self.namespaces or not RESOURCES[resource][2]:
+            return True
+        return (obj.get("metadata") or {}).get("namespace") in self.namespaces
+
+    def apply(self, resource, kind, payload):
+        cache = self.caches[resource]
+        if kind == "SYNC":
+            cache.clear()
+            for obj in payload:
+                if self.keep(resource, obj):
+                    cache[(obj.get("metadata") or {}).get("uid")] = obj
+            self.synced.add(resource)
+        else:
+            if not self.keep(resource, payload):
+                return
+            uid = (payload.get("metadata") or {}).get("uid")
+            if kind == "DELETED":
+                cache.pop(uid, None)
+            else:
+                cache[uid] = payload
+        if not self.dirty:
+            self.first_change = time.time()
+        self.dirty.update(f for f, keys in FILES.items() if resource in keys.values())
+        self.last_change = time.time()
+
+    def due(self):
+        if not self.dirty:
+            return False
+        now = time.time()
+        return now - self.last_change >= self.debounce or now - self.first_change >= self.max_delay
+
+    def write_files(self, files):
+        metadata = {"collection_timestamp": self.now(), "collection_mode": "watch",
+                    "collection_scope": {"targeted": bool(self.namespaces), "namespaces": sorted(self.namespaces)}}
+        for name in files:
+            data = {}
+            for key, resource in FILES[name].items():
+                if resource in self.caches:
+                    data[key] = {"apiVersion": "v1", "kind": "List", "items": list(self.caches[resource].values())}
+            data["collection_metadata"] = metadata
+            write_json(os.path.join(self.data_dir, name), data)
+
+    def helpers_path(self):
+        """Bundle configurado ou, se uma execução mais nova o substituiu, o bundle atual."""
+        if not os.path.exists(self.helpers):
+            directory = os.path.dirname(self.helpers)
+            try:
+                bundles = [os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.startswith("health_helpers-") and name.endswith(".pyz")]
+            except OSError:
+                bundles = []
+            if bundles:
+                self.helpers = max(bundles, key=os.path.getmtime)
+        return self.helpers
+
+    def run_analyzers(self, files):
+        for name, extra in self.analyzers.items():
+            script, inputs, argv, summary_file = ANALYZERS[name]
+            if not files.intersection(inputs):
+                continue
+            if self.helpers:
+                command = [sys.executable, self.helpers_path(), name]
+            else:
+                command = [sys.executable, os.path.join(self.dir, script)]
+            command += [a.replace("{data}", self.data_dir) for a in argv] + list(extra)
+            start = time.time()
+            rc = subprocess.call(command)
+            entry = {"rc": rc, "elapsed_seconds": round(time.time() - start, 3), "updated_at": self.now(),
+                     "inputs": sorted(files.intersection(inputs))}
+            try:
+                with open(os.path.join(self.data_dir, summary_file)) as fp:
+                    entry["summary"] = json.load(fp)
+            except (OSError, ValueError):
+                entry["summary"] = {}
+            self.summary["analyzers"][name] = entry
+
+    def cycle(self):
+        # Só analisa quando todos os caches fizeram o primeiro list
+        if len(self.synced) < len(self.caches):
+            return
+        start = time.time()
+        files, self.dirty = self.dirty, set()
+        self.write_files(files)
+        self.run_analyzers(files)
+        self.summary["cycles"] += 1
+        self.summary["updated_at"] = self.now()
+        self.summary["last_cycle"] = {"files": sorted(files), "elapsed_seconds": round(time.time() - start, 3)}
+        self.summary["caches"] = self.cache_state()
+        self.summary["unavailable_resources"] = sorted(
+            name for name, entry in self.summary["caches"].items() if entry["unavailable"])
+        write_json(self.summary_path, self.summary, indent=2, ensure_ascii=False)
+        print("%s ciclo %d: %s (%.2fs)" % (self.summary["updated_at"], self.summary["cycles"],
+                                         ", ".join(sorted(files)), time.time() - start), flush=True)
+
+    def cache_state(self):
+        state = {}
+        for informer in self.informers:
+            entry = dict(informer.state)
+            entry["objects"] = len(self.caches[informer.resource])
+            entry["synced"] = informer.resource in self.synced
+            state[informer.resource] = entry
+        return state
+
+    def serve(self, bind):
+        # Importado só aqui: status/stop e o watch sem HTTP não pagam o import de http.server
+        try:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        except ImportError:  # Python < 3.7
+            from http.server import BaseHTTPRequestHandler, HTTPServer as ThreadingHTTPServer
+        host, _, port = bind.rpartition(":")
+        watcher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/summary":
+                    try:
+                        with open(watcher.summary_path, "rb") as fp:
+                            body = fp.read()
+                    except OSError:
+                        body = b"{}"
+                elif self.path == "/healthz":
+                    body = json.dumps({"synced": len(watcher.synced) == len(watcher.caches),
+                                       "caches": watcher.cache_state()}).encode("utf-8")
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+        thread = threading.Thread(target=server.serve_forever, name="http")
+        thread.daemon = True
+        thread.start()
+        return server
+
+    def run(self):
+        if not os.path.isdir(self.data_dir):
+            os.makedirs(self.data_dir)
+        write_json(os.path.join(self.dir, "watch.pid"), os.getpid())
+        signal.signal(signal.SIGTERM, lambda *_: self.stop.set())
+        signal.signal(signal.SIGINT, lambda *_: self.stop.set())
+        server = self.serve(self.config["http"]) if self.config.get("http") else None
+        for informer in self.informers:
+            informer.start()
+        print("%s watch iniciado: %s" % (self.now(), ", ".join(sorted(self.caches))), flush=True)
+        while not self.stop.is_set():
+            try:
+                resource, kind, payload = self.events.get(timeout=0.5)
+                self.apply(resource, kind, payload)
+            except queue.Empty:
+                pass
+            if self.due():
+                self.cycle()
+        for informer in self.informers:
+            informer.terminate()
+        if server:
+            server.shutdown()
+        try:
+            os.unlink(os.path.join(self.dir, "watch.pid"))
+        except OSError:
+            pass
+
+
+def read_pid(directory):
+    try:
+        with open(os.path.join(directory, "watch.pid")) as fp:
+            pid = int(json.load(fp))
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modo contínuo do health check (list+watch)")
+    parser.add_argument("action", choices=("run", "status", "stop"))
+    parser.add_argument("--config")
+    parser.add_argument("--dir")
+    args = parser.parse_args()
+    if args.action == "run":
+        if not args.config:
+            parser.error("run exige --config")
+        with open(args.config) as fp:
+            Watcher(json.load(fp)).run()
+        return
+    if not args.dir:
+        parser.error("%s exige --dir" % args.action)
+    pid = read_pid(args.dir)
+    if args.action == "stop":
+        if pid:
+            os.kill(pid, signal.SIGTERM)
+            # Esperar o término para não haver dois watches no mesmo diretório
+            for _ in range(100):
+                if not read_pid(args.dir):
+                    break
+                time.sleep(0.1)
+        print("Watch %s" % ("parado (pid %d)" % pid if pid else "não estava em execução"))
+        return
+    try:
+        with open(os.path.join(args.dir, "latest_summary.json")) as fp:
+            summary = json.load(fp)
+    except (OSError, ValueError):
+        summary = {}
+    summary["running"] = bool(pid)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
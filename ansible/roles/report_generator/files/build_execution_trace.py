@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Monta o trace de execução a partir dos spans do controlador (callback
+health_check_trace) e dos eventos remotos (trace_exec.py).
+
+Uso: build_execution_trace.py <trace_dir>
+
+Lê <trace_dir>/controller_spans.jsonl e <trace_dir>/remote_events.jsonl e grava:
+- execution_trace.json: formato Chrome Trace Event (chrome://tracing, Perfetto)
+- timing_summary.json: tabela resumida (por estágio, por role e passos mais lentos)
+"""
+import json
+import os
+import sys
+
+STAGE_ORDER = ["setup", "collect", "analyze", "report"]
+TOP_STEPS = 15
+
+
+def read_jsonl(path):
+    events = []
+    if not os.path.isfile(path):
+        return events
+    with open(path) as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def span_window(items):
+    start = min(e["ts"] for e in items)
+    end = max(e["ts"] + e["dur"] for e in items)
+    return start, end
+
+
+def to_chrome_events(spans, remote):
+    """pid 1 = controlador (uma faixa por estágio); pid 2 = comandos no host remoto."""
+    out = [
+        {"ph": "M", "pid": 1, "name": "process_name", "args": {"name": "controller (ansible)"}},
+        {"ph": "M", "pid": 2, "name": "process_name", "args": {"name": "remote (oc / scripts)"}},
+    ]
+    for tid, stage in enumerate(STAGE_ORDER, start=1):
+        out.append({"ph": "M", "pid": 1, "tid": tid, "name": "thread_name", "args": {"name": stage}})
+    for s in spans:
+        args = {k: v for k, v in s.items() if k not in ("name", "cat", "ts", "dur")}
+        tid = STAGE_ORDER.index(s["cat"]) + 1 if s.get("cat") in STAGE_ORDER else 1
+        out.append({"ph": "X", "pid": 1, "tid": tid, "name": s["name"], "cat": s.get("cat", ""),
+                    "ts": s["ts"], "dur": s["dur"], "args": args})
+    for e in remote:
+        out.append({"ph": "X", "pid": 2, "tid": 1 if e.get("cat") == "fetch" else 2, "name": e["name"],
+                    "cat": e.get("cat", ""), "ts": e["ts"], "dur": e["dur"], "args": e.get("args", {})})
+    return out
+
+
+def summarize(spans, remote):
+    summary = {"total_seconds": 0.0, "stages": [], "roles": [], "steps": [], "collect_peak_rss_kb": 0}
+    everything = spans + remote
+    if not everything:
+        return summary
+    start, end = span_window(everything)
+    summary["total_seconds"] = round((end - start) / 1e6, 2)
+
+    for stage in STAGE_ORDER:
+        items = [s for s in spans if s.get("cat") == stage]
+        if not items:
+            continue
+        s_start, s_end = span_window(items)
+        summary["stages"].append({
+            "stage": stage,
+            "seconds": round((s_end - s_start) / 1e6, 2),
+            "tasks": len(items),
+        })
+
+    by_role = {}
+    for s in spans:
+        if s.get("role"):
+            by_role.setdefault(s["role"], []).append(s)
+    for role, items in by_role.items():
+        r_start, r_end = span_window(items)
+        summary["roles"].append({"role": role, "seconds": round((r_end - r_start) / 1e6, 2), "tasks": len(items)})
+    summary["roles"].sort(key=lambda r: r["seconds"], reverse=True)
+
+    steps = []
+    for s in spans:
+        moved = max(s.get("bytes_written") or 0, s.get("bytes_read") or 0)
+        steps.append({"name": s["name"], "stage": s.get("cat", ""), "seconds": s["dur"] / 1e6,
+                      "peak_rss_mb": None, "bytes_mb": round(moved / 1048576.0, 2) if moved else None,
+                      "objects": None})
+    for e in remote:
+        a = e.get("args", {})
+        moved = max(a.get("bytes_out") or 0, a.get("bytes_written") or 0)
+        steps.append({"name": e["name"], "stage": "remote:" + e.get("cat", ""), "seconds": e["dur"] / 1e6,
+                      "peak_rss_mb": round((a.get("peak_rss_kb") or 0) / 1024.0, 1),
+                      "bytes_mb": round(moved / 1048576.0, 2), "objects": a.get("objects")})
+        if e.get("cat") == "fetch":
+            summary["collect_peak_rss_kb"] = max(summary["collect_peak_rss_kb"], a.get("peak_rss_kb") or 0)
+    steps.sort(key=lambda x: x["seconds"], reverse=True)
+    for step in steps[:TOP_STEPS]:
+        step["seconds"] = round(step["seconds"], 2)
+        summary["steps"].append(step)
+    return summary
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: build_execution_trace.py <trace_dir>", file=sys.stderr)
+        sys.exit(1)
+    trace_dir = sys.argv[1]
+    spans = read_jsonl(os.path.join(trace_dir, "controller_spans.jsonl"))
+    remote = read_jsonl(os.path.join(trace_dir, "remote_events.jsonl"))
+
+    with open(os.path.join(trace_dir, "execution_trace.json"), "w") as fp:
+        json.dump({"traceEvents": to_chrome_events(spans, remote), "displayTimeUnit": "ms"}, fp)
+    with open(os.path.join(trace_dir, "timing_summary.json"), "w") as fp:
+        json.dump(summarize(spans, remote), fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Relatório da frota: agrega a última execução de cada cluster em um único painel.
+
+Uso:
+  fleet_report.py <reports_base> [<reports_base> ...] --out <dir> [--workers N] [--top N]
+  fleet_report.py --benchmark --clusters 100 --out <dir>
+
+Cada execução (<cluster>_<timestamp>/) é lida em paralelo por um pool de processos,
+que devolve apenas um resumo compacto do cluster: consolidated/report_summary.json e
+os resumos pequenos gravados pelas análises (topology_summary.json,
+node_packing_summary.json, secrets_hygiene_summary.json). Sem report_summary.json o
+resumo é montado com report_sources.py, abrindo um arquivo de análise por vez.
+Dos resumos das análises saem só as métricas próprias (órfãos, nós removíveis, economia,
+achados de secrets): as questões deles já estão nos JSONs de análise e, portanto, nas
+contagens do report_summary.json.
+
+A agregação é feita à medida que os resultados chegam: contadores por categoria e
+heaps de tamanho fixo para os clusters e questões mais críticos, então a memória do
+processo principal cresce só com uma linha por cluster, e não com as análises.
+
+Saídas em <dir>: fleet_summary.json e fleet_report.html, com links relativos para o
+relatório consolidado de cada cluster.
+"""
+import argparse
+import heapq
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from report_sources import LazySources, build_summary  # noqa: E402
+
+EXECUTION_RE = re.compile(r"^(?P<cluster>.+)_(?P<ts>\d{8}T\d{6}|\d{8}_\d{6})$")
+REPORT_SUMMARY = "consolidated/report_summary.json"
+HTML_REPORT = "html/consolidated/consolidated_health_check_report.html"
+MD_REPORT = "consolidated/consolidated_health_check_report.md"
+# Resumo gravado pela análise -> campos copiados para a linha do cluster
+ANALYSIS_SUMMARIES = [
+    ("data_collection/topology_summary.json", "topology"),
+    ("data_collection/node_packing_summary.json", "node_packing"),
+    ("data_collection/secrets_hygiene_summary.json", "secrets_hygiene"),
+]
+DEFAULT_TOP = 20
+
+
+def latest_executions(bases):
+    """Última execução de cada cluster nos diretórios base (o timestamp ordena como texto)."""
+    latest = {}
+    for base in bases:
+        try:
+            names = os.listdir(base)
+        except OSError:
+            continue
+        for name in names:
+            match = EXECUTION_RE.match(name)
+            path = os.path.join(base, name)
+            if not match or not os.path.isdir(path):
+                continue
+            ts = match.group("ts").replace("_", "T")
+            cluster = match.group("cluster")
+            if cluster not in latest or ts > latest[cluster][0]:
+                latest[cluster] = (ts, path)
+    return sorted((cluster, ts, path) for cluster, (ts, path) in latest.items())
+
+
+def read_json(path):
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+
+def load_cluster(item):
+    """Executado no pool: lê os resumos de uma execução e devolve só a linha compacta."""
+    cluster, ts, path = item
+    started = time.time()
+    summary = read_json(os.path.join(path, REPORT_SUMMARY))
+    source = "report_summary"
+    if summary is None:
+        summary = build_summary(LazySources(path), None)
+        source = "report_sources"
+    row = {
+        "cluster": cluster,
+        "timestamp": ts,
+        "path": path,
+        "source": source,
+        "scores": summary.get("scores") or {},
+        "success_rate": (summary.get("collection") or {}).get("success_rate"),
+        "issue_counts": summary.get("issue_counts") or {},
+        "total_issues": summary.get("total_issues") or 0,
+        "critical_issues": [i.get("description") for i in summary.get("critical_issues") or []
+                            if i.get("description")],
+        "report": next((rel for rel in (HTML_REPORT, MD_REPORT) if os.path.exists(os.path.join(path, rel))), None),
+    }
+    for rel_path, name in ANALYSIS_SUMMARIES:
+        data = read_json(os.path.join(path, rel_path))
+        if data is None:
+            continue
+        if name == "topology":
+            row["orphans"] = sum((data.get("orphan_counts") or {}).values())
+        elif name == "node_packing":
+            row["removable_nodes"] = data.get("total_removable_nodes", 0)
+            row["potential_savings"] = data.get("potential_savings", 0)
+        else:
+            row["secret_findings"] = sum((data.get("counts") or {}).values())
+    row["load_seconds"] = round(time.time() - started, 3)
+    return row
+
+
+def severity(row):
+    """Chave de ordenação: mais questões críticas, depois mais questões e pior pontuação."""
+    security = row["scores"].get("security")
+    return (len(row["critical_issues"]), row["total_issues"], -(security if isinstance(security, (int, float)) else 100))
+
+
+class FleetAggregator(object):
+    """Combina as linhas dos clusters sem guardar as análises."""
+
+    def __init__(self, top):
+        self.top = top
+        self.rows = []
+        self.issue_counts = Counter()
+        self.critical = Counter()
+        self.worst = []
+        self.totals = Counter()
+        self.score_sums = Counter()
+        self.score_counts = Counter()
+
+    def add(self, row):
+        self.rows.append(row)
+        self.issue_counts.update(row["issue_counts"])
+        self.critical.update(set(row["critical_issues"]))
+        for key in ("total_issues", "removable_nodes", "potential_savings", "orphans", "secret_findings"):
+            self.totals[key] += row.get(key) or 0
+        self.totals["critical_issues"] += len(row["critical_issues"])
+        for name, value in row["scores"].items():
+            if isinstance(value, (int, float)):
+                self.score_sums[name] += value
+                self.score_counts[name] += 1
+        entry = (severity(row), row["cluster"])
+        if len(self.worst) < self.top:
+            heapq.heappush(self.worst, entry)
+        else:
+            heapq.heappushpop(self.worst, entry)
+        if len(self.critical) > self.top * 50:
+            self.critical = Counter(dict(self.critical.most_common(self.top * 10)))
+
+    def result(self, elapsed):
+        self.rows.sort(key=severity, reverse=True)
+        return {
+            "clusters": len(self.rows),
+            "elapsed_seconds": round(elapsed, 2),
+            "totals": dict((k, round(v, 2)) for k, v in self.totals.items()),
+            "average_scores": dict((name, round(self.score_sums[name] / self.score_counts[name], 1))
+                                   for name in self.score_counts),
+            "issue_counts": dict(self.issue_counts.most_common()),
+            "worst_clusters": [cluster for _, cluster in sorted(self.worst, reverse=True)],
+            "top_critical_issues": [{"description": text, "clusters": count}
+                                    for text, count in self.critical.most_common(self.top)],
+            "rows": self.rows,
+        }
+
+
+def aggregate(executions, workers, top):
+    started = time.time()
+    aggregator = FleetAggregator(top)
+    if workers == 1 or len(executions) < 2:
+        for row in map(load_cluster, executions):
+            aggregator.add(row)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(1, len(executions) // (4 * (workers or os.cpu_count() or 1)))
+            for row in pool.map(load_cluster, executions, chunksize=chunk):
+                aggregator.add(row)
+    return aggregator.result(time.time() - started)
+
+
+def fmt(value, suffix=""):
+    return "N/A" if value is None else "%s%s" % (value, suffix)
+
+
+def render_html(fleet, out_dir):
+    e = html.escape
+    rows = []
+    for row in fleet["rows"]:
+        name = e(row["cluster"])
+        if row["report"]:
+            link = os.path.relpath(os.path.join(row["path"], row["report"]), out_dir)
+            name = '<a href="%s">%s</a>' % (e(link), name)
+        rows.append("<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td class=\"crit\">%d</td><td>%d</td>"
+                    "<td>%s</td><td>%s</td><td>%s</td></tr>"
+                    % (name, e(row["timestamp"]), fmt(row["scores"].get("security")),
+                       fmt(row["success_rate"], "%"), len(row["critical_issues"]), row["total_issues"],
+                       fmt(row.get("removable_nodes")), fmt(row.get("potential_savings")), fmt(row.get("orphans"))))
+    categories = "".join("<tr><td>%s</td><td>%d</td></tr>" % (e(k), v) for k, v in fleet["issue_counts"].items())
+    critical = "".join("<tr><td>%s</td><td>%d</td></tr>" % (e(i["description"]), i["clusters"])
+                       for i in fleet["top_critical_issues"])
+    totals = fleet["totals"]
+    cards = [("Clusters", fleet["clusters"]), ("Questões", totals.get("total_issues", 0)),
+             ("Críticas", totals.get("critical_issues", 0)), ("Nós removíveis", totals.get("removable_nodes", 0)),
+             ("Economia mensal", "$%s" % totals.get("potential_savings", 0)),
+             ("Segurança média", fmt(fleet["average_scores"].get("security")))]
+    return """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Painel da Frota - OpenShift Health Check</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; color: #333; }}
+h1 {{ color: #c00; }}
+.cards {{ display: flex; flex-wrap: wrap; gap: 12px; margin-bottom: 20px; }}
+.card {{ background: #fff; border-radius: 6px; padding: 12px 18px; box-shadow: 0 1px 3px rgba(0,0,0,.15); }}
+.card b {{ display: block; font-size: 1.6em; }}
+table {{ border-collapse: collapse; width: 100%; background: #fff; margin-bottom: 24px; }}
+th, td {{ border: 1px solid #ddd; padding: 6px 10px; text-align: left; }}
+th {{ background: #333; color: #fff; }}
+td.crit {{ color: #c00; font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>Painel da Frota</h1>
+<p>Última execução de cada cluster. Agregação em {elapsed}s.</p>
+<div class="cards">{cards}</div>
+<h2>Clusters</h2>
+<table>
+<tr><th>Cluster</th><th>Execução</th><th>Segurança</th><th>Coleta</th><th>Críticas</th><th>Questões</th>
+<th>Nós removíveis</th><th>Economia mensal</th><th>Órfãos</th></tr>
+{rows}
+</table>
+<h2>Questões por Categoria</h2>
+<table><tr><th>Categoria</th><th>Questões</th></tr>{categories}</table>
+<h2>Questões Críticas Mais Frequentes</h2>
+<table><tr><th>Questão</th><th>Clusters</th></tr>{critical}</table>
+</body>
+</html>
+""".format(elapsed=fleet["elapsed_seconds"], rows="\n".join(rows), categories=categories, critical=critical,
+           cards="".join('<div class="card">%s<b>%s</b></div>' % (e(label), e(str(value))) for label, value in cards))
+
+
+def write_outputs(fleet, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "fleet_summary.json"), "w") as fp:
+        json.dump(fleet, fp, indent=2, ensure_ascii=False)
+    with open(os.path.join(out_dir, "fleet_report.html"), "w") as fp:
+        fp.write(render_html(fleet, out_dir))
+
+
+def make_synthetic(base, clusters):
+    """Execuções sintéticas (só os resumos) para medir a agregação."""
+    for n in range(clusters):
+        path = os.path.join(base, "cluster-%03d_20240101_%06d" % (n, n))
+        os.makedirs(os.path.join(path, "consolidated"))
+        os.makedirs(os.path.join(path, "data_collection"))
+        with open(os.path.join(path, REPORT_SUMMARY), "w") as fp:
+            json.dump({"scores": {"security": 40 + n % 60}, "collection": {"success_rate": 90 + n % 11},
+                       "issue_counts": {"Segurança": n % 17, "Arquitetura": n % 5}, "total_issues": n % 17 + n % 5,
+                       "critical_issues": [{"description": "Questão crítica %d" % (i % 7)} for i in range(n % 10)]}, fp)
+        with open(os.path.join(path, "data_collection/node_packing_summary.json"), "w") as fp:
+            json.dump({"total_removable_nodes": n % 4, "potential_savings": 150.0 * (n % 4), "issues": []}, fp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Painel da frota do OpenShift Health Check")
+    parser.add_argument("reports_base", nargs="*")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--clusters", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp = None
+    bases = args.reports_base
+    if args.benchmark:
+        tmp = tempfile.mkdtemp(prefix="fleet_bench_")
+        make_synthetic(tmp, args.clusters)
+        bases = [tmp]
+    elif not bases:
+        parser.error("informe ao menos um diretório de relatórios")
+    try:
+        executions = latest_executions(bases)
+        if not executions:
+            print("Nenhuma execução encontrada em: %s" % ", ".join(bases), file=sys.stderr)
+            sys.exit(1)
+        fleet = aggregate(executions, args.workers, args.top)
+        write_outputs(fleet, args.out)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+    print("Frota: %d clusters, %d questões (%d críticas) agregados em %.2fs -> %s"
+          % (fleet["clusters"], fleet["totals"].get("total_issues", 0), fleet["totals"].get("critical_issues", 0),
+             fleet["elapsed_seconds"], os.path.join(args.out, "fleet_report.html")))
+
+
+if __name__ == "__main__":
+    main()
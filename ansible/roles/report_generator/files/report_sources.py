@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Acesso sob demanda aos arquivos coletados e de análise para a geração de relatórios.
+
+Uso:
+  report_sources.py summary <reports_dir> --json <saida> [--sections <s1,s2,...>]
+  report_sources.py details <reports_dir> --out <saida.md> [--sections <s1,s2,...>]
+
+Cada arquivo só é aberto quando uma seção habilitada (report_sections) precisa dele
+e é liberado em seguida, então o pico de memória é o do maior arquivo de análise
+lido, e não a soma de todos. Os arquivos coletados (pods.json, events.json, ...)
+nunca são lidos: para os relatórios bastam nome e tamanho (stat).
+
+summary: resumo pequeno (tamanhos, status da coleta, contagem de questões, questões
+principais, pontuações disponíveis) carregado no controlador como facts.
+details: grava as questões de cada análise direto no arquivo de saída, seção a seção.
+"""
+import argparse
+import json
+import os
+
+# Nome lógico -> arquivo relativo ao diretório da execução
+COLLECTED = [
+    ("cluster_info", "data_collection/cluster_info.json"),
+    ("nodes", "data_collection/nodes.json"),
+    ("namespaces", "data_collection/namespaces.json"),
+    ("pods", "data_collection/pods.json"),
+    ("services", "data_collection/services.json"),
+    ("deployments", "data_collection/deployments.json"),
+    ("rbac", "data_collection/rbac.json"),
+    ("security_configs", "data_collection/security_configs.json"),
+    ("operators", "data_collection/operators.json"),
+    ("metrics", "data_collection/metrics.json"),
+    ("events", "data_collection/events.json"),
+]
+# Seção de report_sections -> (categoria, arquivo de análise, prioridade das questões)
+ANALYSES = [
+    ("security_analysis", "Segurança", "security_analysis/security_analysis.json", "Alta"),
+    ("architecture_analysis", "Arquitetura", "architecture_analysis/architecture_analysis.json", "Média"),
+    ("resource_optimization_analysis", "Recursos",
+     "resource_optimization/resource_optimization_analysis.json", "Média"),
+    ("best_practices_analysis", "Melhores Práticas",
+     "best_practices_analysis/best_practices_analysis.json", "Baixa"),
+]
+COLLECTION_SUMMARY = "data_collection/collection_summary.json"
+MAX_CRITICAL = 10
+
+
+class LazySources(object):
+    """Abre cada arquivo JSON só no primeiro acesso; release() descarta o conteúdo."""
+
+    def __init__(self, base):
+        self.base = base
+        self._loaded = {}
+
+    def path(self, rel_path):
+        return os.path.join(self.base, rel_path)
+
+    def size(self, rel_path):
+        try:
+            return os.path.getsize(self.path(rel_path))
+        except OSError:
+            return None
+
+    def get(self, rel_path):
+        if rel_path not in self._loaded:
+            try:
+                with open(self.path(rel_path)) as fp:
+                    self._loaded[rel_path] = json.load(fp)
+            except (OSError, ValueError):
+                self._loaded[rel_path] = None
+        return self._loaded[rel_path]
+
+    def release(self, rel_path):
+        self._loaded.pop(rel_path, None)
+
+
+def human_size(size):
+    if size is None:
+        return "N/A"
+    if size < 1024:
+        return "%d B" % size
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024.0
+        if size < 1024 or unit == "GB":
+            return "%.1f %s" % (size, unit)
+
+
+def issue_text(item):
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get("description") or item.get("issue") or item.get("message")
+    return None
+
+
+def iter_issues(data, path=()):
+    """Percorre a análise e gera (subseção, texto) das listas 'issues'/'*_issues'."""
+    if not isinstance(data, dict):
+        return
+    for key, value in data.items():
+        if isinstance(value, dict):
+            for found in iter_issues(value, path + (key,)):
+                yield found
+        elif isinstance(value, list) and (key == "issues" or key.endswith("_issues")):
+            for item in value:
+                text = issue_text(item)
+                if text:
+                    yield ".".join(path) or key, text
+
+
+def enabled_analyses(sections):
+    return [a for a in ANALYSES if sections is None or a[0] in sections]
+
+
+def as_bool(value):
+    return value is True or str(value).lower() in ("true", "yes", "1")
+
+
+def build_summary(sources, sections):
+    summary = {"data_files": {}, "file_sizes": {}, "total_size": "N/A", "collection": {},
+               "scores": {}, "issue_counts": {}, "total_issues": 0, "critical_issues": []}
+    total = 0
+    for name, rel_path in COLLECTED:
+        size = sources.size(rel_path)
+        summary["data_files"][name] = os.path.basename(rel_path) if size is not None else ""
+        summary["file_sizes"][name] = human_size(size)
+        total += size or 0
+    summary["total_size"] = human_size(total)
+
+    collection = sources.get(COLLECTION_SUMMARY) or {}
+    status = (collection.get("collection_summary") or {}).get("collection_status") or {}
+    if isinstance(status, dict) and status:
+        ok = sum(1 for v in status.values() if as_bool(v))
+        summary["collection"] = {"total_components": len(status), "successful": ok,
+                                 "failed": len(status) - ok,
+                                 "success_rate": int(round(100.0 * ok / len(status)))}
+    sources.release(COLLECTION_SUMMARY)
+
+    for _, category, rel_path, priority in enabled_analyses(sections):
+        data = sources.get(rel_path)
+        if data is None:
+            continue
+        if "overall_security_score" in data:
+            summary["scores"]["security"] = data["overall_security_score"]
+        count = 0
+        for subsection, text in iter_issues(data):
+            count += 1
+            if len(summary["critical_issues"]) < MAX_CRITICAL and priority == "Alta":
+                summary["critical_issues"].append({"category": category, "description": text,
+                                                   "priority": priority, "impact": subsection})
+        summary["issue_counts"][category] = count
+        summary["total_issues"] += count
+        sources.release(rel_path)
+    return summary
+
+
+def write_details(sources, sections, out_path):
+    with open(out_path, "w") as out:
+        out.write("# Achados Detalhados\n\n")
+        out.write("## Arquivos Coletados\n\n| Arquivo | Tamanho |\n|---------|---------|\n")
+        for _, rel_path in COLLECTED:
+            size = sources.size(rel_path)
+            if size is not None:
+                out.write("| %s | %s |\n" % (os.path.basename(rel_path), human_size(size)))
+        for _, category, rel_path, priority in enabled_analyses(sections):
+            data = sources.get(rel_path)
+            if data is None:
+                continue
+            out.write("\n## %s\n" % category)
+            current = None
+            count = 0
+            for subsection, text in iter_issues(data):
+                if subsection != current:
+                    current = subsection
+                    out.write("\n### %s\n\n" % subsection)
+                out.write("- [%s] %s\n" % (priority, text))
+                count += 1
+            if not count:
+                out.write("\nNenhuma questão encontrada.\n")
+            sources.release(rel_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fontes de dados dos relatórios do OpenShift Health Check")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_summary = sub.add_parser("summary")
+    p_summary.add_argument("reports_dir")
+    p_summary.add_argument("--json", dest="json_out", required=True)
+    p_summary.add_argument("--sections")
+    p_details = sub.add_parser("details")
+    p_details.add_argument("reports_dir")
+    p_details.add_argument("--out", required=True)
+    p_details.add_argument("--sections")
+    args = parser.parse_args()
+
+    sections = set(s.strip() for s in args.sections.split(",")) if args.sections else None
+    sources = LazySources(args.reports_dir)
+    if args.command == "summary":
+        with open(args.json_out, "w") as fp:
+            json.dump(build_summary(sources, sections), fp, indent=2, ensure_ascii=False)
+        return
+    write_details(sources, sections, args.out)
+
+
+if __name__ == "__main__":
+    main()
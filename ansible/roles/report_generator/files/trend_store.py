@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Histórico de execuções do health check em SQLite (um arquivo por diretório de relatórios).
+
+Uso:
+  trend_store.py ingest <reports_base> [<execution_dir> ...]
+  trend_store.py diff <reports_base> --cluster <nome> [--since last|7d|<AAAA-MM-DD>] [--json <saida>]
+
+ingest: lê os JSONs de análise de cada execução (<cluster>_<timestamp>/) e grava
+métricas numéricas e questões. É incremental: execuções já ingeridas são ignoradas,
+e sem diretórios explícitos só as execuções novas em <reports_base> são lidas.
+
+diff: compara a execução mais recente do cluster com a anterior (--since last, padrão)
+ou com a última execução antes da janela informada (ex.: 7d), e inclui sparklines
+das pontuações nas últimas execuções. As consultas usam índice por cluster/data.
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import sys
+
+DB_NAME = "trend_store.sqlite"
+EXECUTION_RE = re.compile(r"^(?P<cluster>.+)_(?P<ts>\d{8}T\d{6}|\d{8}_\d{6})$")
+# Arquivo (relativo à execução) -> prefixo das métricas
+SOURCES = [
+    ("data_collection/collection_summary.json", "collection"),
+    ("architecture_analysis/architecture_analysis.json", "architecture"),
+    ("security_analysis/security_analysis.json", "security"),
+    ("best_practices_analysis/best_practices_analysis.json", "best_practices"),
+    ("resource_optimization/resource_optimization_analysis.json", "resource_optimization"),
+    ("resource_optimization/resource_optimization.json", "resource_optimization"),
+    ("trace/timing_summary.json", "timing"),
+    ("consolidated/report_summary.json", "report"),
+]
+# Do resumo consolidado só os totais finais; as questões já vêm dos JSONs de análise
+REPORT_SUMMARY_KEYS = ("total_issues", "issue_counts", "scores", "collection")
+SINCE_RE = re.compile(r"^\d+d$")
+MAX_DEPTH = 4
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+SPARK_RUNS = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    execution_id TEXT UNIQUE NOT NULL,
+    cluster TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_cluster_started ON runs (cluster, started_at);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    category TEXT NOT NULL,
+    issue TEXT NOT NULL,
+    PRIMARY KEY (run_id, category, issue)
+) WITHOUT ROWID;
+"""
+
+
+def connect(reports_base):
+    conn = sqlite3.connect(os.path.join(reports_base, DB_NAME))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def parse_execution_id(execution_id, path):
+    match = EXECUTION_RE.match(execution_id)
+    if not match:
+        return None, None
+    ts = match.group("ts").replace("_", "T")
+    try:
+        started = datetime.datetime.strptime(ts, "%Y%m%dT%H%M%S")
+    except ValueError:
+        started = datetime.datetime.fromtimestamp(os.path.getmtime(path))
+    return match.group("cluster"), started.isoformat()
+
+
+def as_number(value):
+    # set_fact do Ansible costuma gravar números como string ("12")
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def issue_text(item):
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get("description") or item.get("issue") or item.get("message")
+    return None
+
+
+def flatten(data, prefix, metrics, issues, depth=0):
+    """Coleta folhas numéricas (métricas) e listas 'issues'/'*_issues' (questões)."""
+    if not isinstance(data, dict) or depth > MAX_DEPTH:
+        return
+    for key, value in data.items():
+        name = "%s.%s" % (prefix, key)
+        if isinstance(value, dict):
+            flatten(value, name, metrics, issues, depth + 1)
+        elif isinstance(value, list):
+            if key == "issues" or key.endswith("_issues"):
+                for item in value:
+                    text = issue_text(item)
+                    if text:
+                        issues.add((prefix.split(".")[0], text))
+        else:
+            number = as_number(value)
+            if number is not None:
+                metrics[name] = number
+
+
+def load_execution(execution_dir):
+    metrics, issues = {}, set()
+    for rel_path, prefix in SOURCES:
+        path = os.path.join(execution_dir, rel_path)
+        if not os.path.isfile(path):
+            continue
+        try:
+            with open(path) as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            continue
+        if prefix == "report" and isinstance(data, dict):
+            data = dict((key, data[key]) for key in REPORT_SUMMARY_KEYS if key in data)
+        flatten(data, prefix, metrics, issues)
+    metrics["issues.total"] = float(len(issues))
+    return metrics, issues
+
+
+def ingest(conn, reports_base, execution_dirs):
+    known = {row[0] for row in conn.execute("SELECT execution_id FROM runs")}
+    if not execution_dirs:
+        execution_dirs = [os.path.join(reports_base, name) for name in sorted(os.listdir(reports_base))
+                          if name not in known and os.path.isdir(os.path.join(reports_base, name))]
+    added = 0
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    for execution_dir in execution_dirs:
+        execution_id = os.path.basename(os.path.normpath(execution_dir))
+        if execution_id in known:
+            continue
+        cluster, started_at = parse_execution_id(execution_id, execution_dir)
+        if cluster is None:
+            continue
+        metrics, issues = load_execution(execution_dir)
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (execution_id, cluster, started_at, ingested_at) VALUES (?, ?, ?, ?)",
+                (execution_id, cluster, started_at, now))
+            run_id = cur.lastrowid
+            conn.executemany("INSERT INTO metrics VALUES (?, ?, ?)",
+                             [(run_id, name, value) for name, value in metrics.items()])
+            conn.executemany("INSERT INTO issues VALUES (?, ?, ?)",
+                             [(run_id, category, text) for category, text in issues])
+        known.add(execution_id)
+        added += 1
+    return added
+
+
+def find_baseline(conn, cluster, latest, since):
+    if since == "last":
+        return conn.execute(
+            "SELECT run_id, execution_id, started_at FROM runs WHERE cluster = ? AND started_at < ? "
+            "ORDER BY started_at DESC LIMIT 1", (cluster, latest[2])).fetchone()
+    if since.endswith("d") and since[:-1].isdigit():
+        started = datetime.datetime.fromisoformat(latest[2])
+        cutoff = (started - datetime.timedelta(days=int(since[:-1]))).isoformat()
+    else:
+        cutoff = datetime.datetime.fromisoformat(since).isoformat()
+    return conn.execute(
+        "SELECT run_id, execution_id, started_at FROM runs WHERE cluster = ? AND started_at <= ? "
+        "ORDER BY started_at DESC LIMIT 1", (cluster, cutoff)).fetchone()
+
+
+def sparkline(values):
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[int(round((v - low) * scale))] for v in values)
+
+
+def trend_metrics(conn, cluster):
+    """Pontuações, total de questões e tempo total das últimas execuções (ordem cronológica)."""
+    rows = conn.execute(
+        "SELECT r.started_at, m.name, m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id "
+        "WHERE r.run_id IN (SELECT run_id FROM runs WHERE cluster = ? ORDER BY started_at DESC LIMIT ?) "
+        "AND (m.name LIKE '%score' OR m.name IN ('issues.total', 'timing.total_seconds')) "
+        "ORDER BY r.started_at", (cluster, SPARK_RUNS)).fetchall()
+    series = {}
+    for _, name, value in rows:
+        series.setdefault(name, []).append(value)
+    return [{"metric": name, "values": values, "sparkline": sparkline(values)}
+            for name, values in sorted(series.items())]
+
+
+def diff(conn, cluster, since):
+    latest = conn.execute(
+        "SELECT run_id, execution_id, started_at FROM runs WHERE cluster = ? "
+        "ORDER BY started_at DESC LIMIT 1", (cluster,)).fetchone()
+    result = {"cluster": cluster, "since": since, "latest": None, "baseline": None,
+              "changed_metrics": [], "new_issues": [], "resolved_issues": [], "trends": []}
+    if latest is None:
+        return result
+    result["latest"] = latest[1]
+    result["trends"] = trend_metrics(conn, cluster)
+    baseline = find_baseline(conn, cluster, latest, since)
+    if baseline is None:
+        return result
+    result["baseline"] = baseline[1]
+
+    current = dict(conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (latest[0],)))
+    previous = dict(conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (baseline[0],)))
+    for name in sorted(set(current) | set(previous)):
+        before, after = previous.get(name), current.get(name)
+        if before != after:
+            result["changed_metrics"].append({"metric": name, "before": before, "after": after})
+
+    now_issues = set(conn.execute("SELECT category, issue FROM issues WHERE run_id = ?", (latest[0],)))
+    old_issues = set(conn.execute("SELECT category, issue FROM issues WHERE run_id = ?", (baseline[0],)))
+    result["new_issues"] = [{"category": c, "issue": i} for c, i in sorted(now_issues - old_issues)]
+    result["resolved_issues"] = [{"category": c, "issue": i} for c, i in sorted(old_issues - now_issues)]
+    return result
+
+
+def since_arg(value):
+    """--since: last, <N>d ou data ISO (AAAA-MM-DD[THH:MM:SS])."""
+    if value == "last" or SINCE_RE.match(value):
+        return value
+    try:
+        datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("período inválido: %r (use last, 7d, 30d ou AAAA-MM-DD)" % value)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico de execuções do OpenShift Health Check")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest")
+    p_ingest.add_argument("reports_base")
+    p_ingest.add_argument("execution_dirs", nargs="*")
+    p_diff = sub.add_parser("diff")
+    p_diff.add_argument("reports_base")
+    p_diff.add_argument("--cluster", required=True)
+    p_diff.add_argument("--since", default="last", type=since_arg)
+    p_diff.add_argument("--json", dest="json_out")
+    args = parser.parse_args()
+
+    conn = connect(args.reports_base)
+    if args.command == "ingest":
+        added = ingest(conn, args.reports_base, args.execution_dirs)
+        print("Execuções ingeridas: %d" % added)
+        return
+    result = diff(conn, args.cluster, args.since)
+    if args.json_out:
+        with open(args.json_out, "w") as fp:
+            json.dump(result, fp, indent=2, ensure_ascii=False)
+        return
+    if result["latest"] is None:
+        print("Nenhuma execução encontrada para o cluster %s" % args.cluster)
+        sys.exit(1)
+    print("Cluster: %s | atual: %s | base: %s" % (args.cluster, result["latest"], result["baseline"] or "-"))
+    for trend in result["trends"]:
+        print("  %-55s %s  %s" % (trend["metric"], trend["sparkline"], trend["values"][-1]))
+    for change in result["changed_metrics"]:
+        print("  ~ %s: %s -> %s" % (change["metric"], change["before"], change["after"]))
+    for issue in result["new_issues"]:
+        print("  + [%s] %s" % (issue["category"], issue["issue"]))
+    for issue in result["resolved_issues"]:
+        print("  - [%s] %s" % (issue["category"], issue["issue"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Simulador de consolidação de nós (bin packing) no host remoto.
+
+Uso: node_packing.py <data_collection_dir> --out <resumo.json>
+                     [--max-utilization 80] [--min-pool-nodes 2]
+                     [--cpu-hour 0.05] [--memory-gb-hour 0.01]
+     node_packing.py --benchmark [--nodes 500] [--pods 50000]
+       (inclui uma verificação de pool limitado por max-pods, não por CPU ou memória)
+
+Lê a capacidade alocável, labels, taints e o pool (MachineSet, via machines) de cada nó em
+nodes.json e os requests, nodeSelector, afinidade de nó obrigatória e tolerations de cada
+pod em pods.json. Para cada pool (mais caro primeiro), tenta esvaziar os nós menos
+ocupados, realocando seus pods com first-fit-decreasing nos demais nós do cluster até
+--max-utilization % do alocável. O nó só sai se todos os pods couberem; caso contrário a
+tentativa é desfeita. Pods de DaemonSet e static pods somem com o nó; pods sem
+controlador o prendem. O resultado é quantos nós cada pool pode perder e a diferença de
+custo mensal (custo do nó = CPU * --cpu-hour + memória GB * --memory-gb-hour, 730 h).
+
+O núcleo do first-fit é vetorizado com numpy (máscaras de capacidade e de restrições sobre
+todos os nós por pod); sem numpy, ou com menos de NUMPY_MIN_NODES nós (onde o Python puro
+é mais rápido e dispensa importar o numpy), usa uma implementação em Python puro com o
+mesmo resultado. Limitações: afinidade/anti-afinidade entre pods, PodDisruptionBudgets e
+volumes locais não são considerados.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+
+np = None  # importado sob demanda (load_numpy)
+
+HOURS_PER_MONTH = 730
+MAX_LISTED = 50
+QUANTITY_RE = re.compile(r"^([0-9.eE+-]+)([a-zA-Z]*)$")
+SUFFIXES = {"": 1, "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12,
+            "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40}
+CONTROL_PLANE_ROLES = ("node-role.kubernetes.io/master", "node-role.kubernetes.io/control-plane")
+MACHINESET_LABEL = "machine.openshift.io/cluster-api-machineset"
+MIRROR_ANNOTATION = "kubernetes.io/config.mirror"
+NUMPY_MIN_NODES = 400
+
+
+def parse_quantity(value):
+    match = QUANTITY_RE.match(str(value).strip())
+    if not match or match.group(2) not in SUFFIXES:
+        return 0.0
+    try:
+        return float(match.group(1)) * SUFFIXES[match.group(2)]
+    except ValueError:
+        return 0.0
+
+
+def items_of(data, key):
+    value = data.get(key) if isinstance(data, dict) else None
+    return value.get("items", []) if isinstance(value, dict) else []
+
+
+class Node(object):
+    __slots__ = ("name", "pool", "cpu", "memory", "pods", "labels", "taints", "schedulable", "removable",
+                 "monthly_cost")
+
+    def __init__(self, name, pool, cpu, memory, pods, labels, taints, schedulable, removable):
+        self.name, self.pool = name, pool
+        self.cpu, self.memory, self.pods = cpu, memory, pods
+        self.labels, self.taints = labels, taints
+        self.schedulable, self.removable = schedulable, removable
+        self.monthly_cost = 0.0
+
+
+class Pod(object):
+    __slots__ = ("name", "node", "cpu", "memory", "signature", "movable", "pinned")
+
+    def __init__(self, name, node, cpu, memory, signature, movable, pinned):
+        self.name, self.node = name, node
+        self.cpu, self.memory = cpu, memory
+        self.signature, self.movable, self.pinned = signature, movable, pinned
+
+
+def pod_requests(spec):
+    """Requests efetivos: soma dos containers, ou o maior initContainer se for maior."""
+    def total(containers, index):
+        values = []
+        for container in containers or []:
+            requests = (container.get("resources") or {}).get("requests") or {}
+            values.append(parse_quantity(requests.get(("cpu", "memory")[index], 0)))
+        return values
+    cpu = max([sum(total(spec.get("containers"), 0))] + total(spec.get("initContainers"), 0))
+    memory = max([sum(total(spec.get("containers"), 1))] + total(spec.get("initContainers"), 1))
+    return cpu, memory
+
+
+def constraint_signature(spec):
+    affinity = ((spec.get("affinity") or {}).get("nodeAffinity") or {}).get(
+        "requiredDuringSchedulingIgnoredDuringExecution") or {}
+    return json.dumps([spec.get("nodeSelector") or {}, affinity.get("nodeSelectorTerms") or [],
+                       spec.get("tolerations") or []], sort_keys=True, separators=(",", ":"))
+
+
+def expression_matches(expr, values_of):
+    key, operator, values = expr.get("key"), expr.get("operator"), expr.get("values") or []
+    present, value = values_of(key)
+    if operator == "In":
+        return present and value in values
+    if operator == "NotIn":
+        return not present or value not in values
+    if operator == "Exists":
+        return present
+    if operator == "DoesNotExist":
+        return not present
+    if operator in ("Gt", "Lt") and present and values:
+        try:
+            return int(value) > int(values[0]) if operator == "Gt" else int(value) < int(values[0])
+        except ValueError:
+            return False
+    return False
+
+
+def tolerated(taint, tolerations):
+    for tol in tolerations:
+        if tol.get("effect") and tol.get("effect") != taint.get("effect"):
+            continue
+        if not tol.get("key") and tol.get("operator") == "Exists":
+            return True
+        if tol.get("key") != taint.get("key"):
+            continue
+        if tol.get("operator") == "Exists" or tol.get("value", "") == taint.get("value", ""):
+            return True
+    return False
+
+
+def node_feasible(node, signature):
+    node_selector, terms, tolerations = json.loads(signature)
+    if not node.schedulable:
+        return False
+    if any(node.labels.get(k) != v for k, v in node_selector.items()):
+        return False
+    if terms:
+        label = lambda key: (key in node.labels, node.labels.get(key))
+        field = lambda key: (key == "metadata.name", node.name)
+        if not any(all(expression_matches(e, label) for e in term.get("matchExpressions") or [])
+                   and all(expression_matches(e, field) for e in term.get("matchFields") or [])
+                   for term in terms):
+            return False
+    return all(tolerated(t, tolerations) for t in node.taints if t.get("effect") in ("NoSchedule", "NoExecute"))
+
+
+def load_cluster(data_dir):
+    with open(os.path.join(data_dir, "nodes.json")) as fp:
+        nodes_data = json.load(fp)
+    machineset_of = {}
+    for machine in items_of(nodes_data, "machines"):
+        node_name = ((machine.get("status") or {}).get("nodeRef") or {}).get("name")
+        machineset = ((machine.get("metadata") or {}).get("labels") or {}).get(MACHINESET_LABEL)
+        if node_name and machineset:
+            machineset_of[node_name] = machineset
+    nodes = []
+    for item in items_of(nodes_data, "nodes_json"):
+        meta, spec = item.get("metadata") or {}, item.get("spec") or {}
+        labels = meta.get("labels") or {}
+        allocatable = (item.get("status") or {}).get("allocatable") or {}
+        control_plane = any(role in labels for role in CONTROL_PLANE_ROLES)
+        roles = sorted(k.split("/", 1)[1] for k in labels if k.startswith("node-role.kubernetes.io/"))
+        pool = machineset_of.get(meta.get("name")) or "%s (%s)" % (
+            ",".join(roles) or "sem role", labels.get("node.kubernetes.io/instance-type", "tipo desconhecido"))
+        nodes.append(Node(meta.get("name", ""), pool, parse_quantity(allocatable.get("cpu", 0)),
+                          parse_quantity(allocatable.get("memory", 0)), int(parse_quantity(allocatable.get("pods", 110))),
+                          labels, spec.get("taints") or [], not spec.get("unschedulable"), not control_plane))
+    del nodes_data
+
+    with open(os.path.join(data_dir, "pods.json")) as fp:
+        pods_data = json.load(fp)
+    pods = []
+    for item in items_of(pods_data, "pods_json"):
+        meta, spec = item.get("metadata") or {}, item.get("spec") or {}
+        if (item.get("status") or {}).get("phase") in ("Succeeded", "Failed") or not spec.get("nodeName"):
+            continue
+        owners = meta.get("ownerReferences") or []
+        daemon = any(o.get("kind") == "DaemonSet" for o in owners) or MIRROR_ANNOTATION in (meta.get("annotations") or {})
+        cpu, memory = pod_requests(spec)
+        pods.append(Pod("%s/%s" % (meta.get("namespace", ""), meta.get("name", "")), spec["nodeName"], cpu, memory,
+                        constraint_signature(spec), movable=bool(owners) and not daemon, pinned=not owners and not daemon))
+    return nodes, pods
+
+
+class PythonPacker(object):
+    """First-fit sobre listas; mesmo resultado do NumpyPacker."""
+    backend = "python"
+
+    def __init__(self, cpu, memory, pods, masks):
+        self.free = [list(cpu), list(memory), list(pods)]
+        self.alive = [True] * len(cpu)
+        self.masks = masks
+
+    def place(self, cpu, memory, signature):
+        free_cpu, free_mem, free_pods = self.free
+        alive, mask = self.alive, self.masks[signature]
+        for j in range(len(alive)):
+            if alive[j] and mask[j] and free_cpu[j] >= cpu and free_mem[j] >= memory and free_pods[j] >= 1:
+                free_cpu[j] -= cpu
+                free_mem[j] -= memory
+                free_pods[j] -= 1
+                return j
+        return -1
+
+    def release(self, j, cpu, memory):
+        self.free[0][j] += cpu
+        self.free[1][j] += memory
+        self.free[2][j] += 1
+
+    def remove(self, j):
+        self.alive[j] = False
+
+    def snapshot(self):
+        return [list(f) for f in self.free], list(self.alive)
+
+    def restore(self, state):
+        self.free, self.alive = [list(f) for f in state[0]], list(state[1])
+
+
+class NumpyPacker(PythonPacker):
+    """First-fit vetorizado: uma máscara sobre todos os nós por pod e argmax do primeiro True."""
+    backend = "numpy"
+
+    def __init__(self, cpu, memory, pods, masks):
+        self.free = np.array([cpu, memory, pods], dtype=np.float64)
+        self.alive = np.ones(len(cpu), dtype=bool)
+        self.masks = dict((sig, np.asarray(mask, dtype=bool)) for sig, mask in masks.items())
+
+    def place(self, cpu, memory, signature):
+        fits = self.alive & self.masks[signature]
+        fits &= self.free[0] >= cpu
+        fits &= self.free[1] >= memory
+        fits &= self.free[2] >= 1
+        j = int(fits.argmax())
+        if not fits[j]:
+            return -1
+        self.free[:, j] -= (cpu, memory, 1)
+        return j
+
+    def release(self, j, cpu, memory):
+        self.free[:, j] += (cpu, memory, 1)
+
+    def snapshot(self):
+        return self.free.copy(), self.alive.copy()
+
+    def restore(self, state):
+        self.free, self.alive = state[0].copy(), state[1].copy()
+
+
+def load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+def make_packer(cpu, memory, pods, masks, backend):
+    if backend == "auto" and len(cpu) < NUMPY_MIN_NODES:
+        backend = "python"
+    if backend in ("numpy", "auto") and load_numpy() is not None:
+        return NumpyPacker(cpu, memory, pods, masks)
+    return PythonPacker(cpu, memory, pods, masks)
+
+
+def first_fit_decreasing(packer, pods, ref_cpu, ref_memory):
+    """Aloca os pods (maior fatia dominante primeiro); devolve [(pod, nó)] ou None se algum não couber."""
+    order = sorted(pods, key=lambda p: max(p.cpu / ref_cpu, p.memory / ref_memory), reverse=True)
+    placed = []
+    for pod in order:
+        j = packer.place(pod.cpu, pod.memory, pod.signature)
+        if j < 0:
+            return None
+        placed.append((pod, j))
+    return placed
+
+
+def simulate(nodes, pods, max_utilization=80, min_pool_nodes=2, backend="auto"):
+    """Esvazia nós por pool enquanto os pods couberem no restante; devolve o plano por pool."""
+    index = dict((n.name, j) for j, n in enumerate(nodes))
+    pods = [p for p in pods if p.node in index]
+    on_node = [[] for _ in nodes]
+    used = [[0.0, 0.0, 0] for _ in nodes]
+    for pod in pods:
+        j = index[pod.node]
+        on_node[j].append(pod)
+        used[j][0] += pod.cpu
+        used[j][1] += pod.memory
+        used[j][2] += 1
+
+    # Ordem first-fit: nós mais ocupados primeiro, para concentrar a carga e liberar os ociosos
+    order = sorted(range(len(nodes)), key=lambda j: share_of(used[j], nodes[j]), reverse=True)
+    nodes = [nodes[j] for j in order]
+    on_node = [on_node[j] for j in order]
+    used = [used[j] for j in order]
+    limit = max_utilization / 100.0
+    masks = {}
+    for pod in pods:
+        if pod.movable and pod.signature not in masks:
+            masks[pod.signature] = [node_feasible(n, pod.signature) for n in nodes]
+    packer = make_packer([n.cpu * limit - u[0] for n, u in zip(nodes, used)],
+                         [n.memory * limit - u[1] for n, u in zip(nodes, used)],
+                         [n.pods - u[2] for n, u in zip(nodes, used)], masks, backend)
+    ref_cpu = max(sum(n.cpu for n in nodes) / max(len(nodes), 1), 1e-9)
+    ref_memory = max(sum(n.memory for n in nodes) / max(len(nodes), 1), 1e-9)
+
+    pools = {}
+    for j, node in enumerate(nodes):
+        pools.setdefault(node.pool, []).append(j)
+    plan = []
+    for pool, members in sorted(pools.items(), key=lambda kv: -max(nodes[j].monthly_cost for j in kv[1])):
+        result = {"pool": pool, "nodes": len(members), "removable": 0, "removable_nodes": [],
+                  "monthly_savings": 0.0, "blocked_by_unmanaged_pods": 0, "blocked_by_capacity": 0,
+                  "control_plane": not nodes[members[0]].removable}
+        plan.append(result)
+        if not nodes[members[0]].removable:
+            continue
+        remaining = len(members)
+        for j in sorted(members, key=lambda j: share_of(used[j], nodes[j])):
+            if remaining <= min_pool_nodes:
+                break
+            if any(p.pinned for p in on_node[j]):
+                result["blocked_by_unmanaged_pods"] += 1
+                continue
+            state = packer.snapshot()
+            packer.remove(j)
+            placed = first_fit_decreasing(packer, [p for p in on_node[j] if p.movable], ref_cpu, ref_memory)
+            if placed is None:
+                packer.restore(state)
+                result["blocked_by_capacity"] += 1
+                continue
+            for pod, target in placed:
+                on_node[target].append(pod)
+                used[target][0] += pod.cpu
+                used[target][1] += pod.memory
+                used[target][2] += 1
+            on_node[j] = []
+            remaining -= 1
+            result["removable"] += 1
+            result["monthly_savings"] += nodes[j].monthly_cost
+            result["removable_nodes"].append(nodes[j].name)
+        result["monthly_savings"] = round(result["monthly_savings"], 2)
+        result["removable_nodes"] = result["removable_nodes"][:MAX_LISTED]
+    return plan, packer.backend
+
+
+def share_of(used, node):
+    return max(used[0] / node.cpu if node.cpu else 1.0, used[1] / node.memory if node.memory else 1.0)
+
+
+def summarize(nodes, pods, args):
+    for node in nodes:
+        node.monthly_cost = (node.cpu * args.cpu_hour + node.memory / 2 ** 30 * args.memory_gb_hour) * HOURS_PER_MONTH
+    start = time.time()
+    plan, backend = simulate(nodes, pods, args.max_utilization, args.min_pool_nodes)
+    elapsed = time.time() - start
+    current = sum(n.monthly_cost for n in nodes)
+    savings = sum(p["monthly_savings"] for p in plan)
+    removable = sum(p["removable"] for p in plan)
+    total_cpu, total_memory = sum(n.cpu for n in nodes), sum(n.memory for n in nodes)
+    requested_cpu, requested_memory = sum(p.cpu for p in pods), sum(p.memory for p in pods)
+    summary = {
+        "backend": backend,
+        "elapsed_seconds": round(elapsed, 3),
+        "total_nodes": len(nodes),
+        "total_pods": len(pods),
+        "movable_pods": sum(1 for p in pods if p.movable),
+        "unmanaged_pods": sum(1 for p in pods if p.pinned),
+        "max_utilization": args.max_utilization,
+        "requested_cpu_percentage": round(100.0 * requested_cpu / total_cpu, 1) if total_cpu else 0,
+        "requested_memory_percentage": round(100.0 * requested_memory / total_memory, 1) if total_memory else 0,
+        "pools": plan,
+        "total_removable_nodes": removable,
+        "current_monthly_cost": round(current, 2),
+        "optimized_monthly_cost": round(current - savings, 2),
+        "potential_savings": round(savings, 2),
+        "savings_percentage": round(100.0 * savings / current, 1) if current else 0,
+        "recommendations": [],
+        "issues": [],
+    }
+    for pool in plan:
+        if pool["removable"]:
+            summary["recommendations"].append(
+                "Pool %s: reduzir de %d para %d nós (economia estimada de $%.2f/mês)"
+                % (pool["pool"], pool["nodes"], pool["nodes"] - pool["removable"], pool["monthly_savings"]))
+        if pool["blocked_by_unmanaged_pods"]:
+            summary["issues"].append("Pool %s: %d nós com pods sem controlador impedem a consolidação"
+                                     % (pool["pool"], pool["blocked_by_unmanaged_pods"]))
+    return summary
+
+
+def synthetic_cluster(node_count, pod_count, seed=42):
+    rng = random.Random(seed)
+    pools = [("worker-a", 16, 64), ("worker-b", 8, 32), ("worker-c", 32, 128), ("infra", 8, 32), ("gpu", 16, 64)]
+    nodes = []
+    for i in range(node_count):
+        pool, cpu, mem = pools[i % len(pools)]
+        labels = {"node-role.kubernetes.io/worker": "", "pool": pool}
+        taints = [{"key": "dedicated", "value": pool, "effect": "NoSchedule"}] if pool in ("infra", "gpu") else []
+        nodes.append(Node("node-%04d" % i, pool, float(cpu), mem * 2.0 ** 30, 250, labels, taints, True, True))
+    signatures = {None: constraint_signature({})}
+    for pool in ("infra", "gpu"):
+        signatures[pool] = constraint_signature({"nodeSelector": {"pool": pool},
+                                                 "tolerations": [{"key": "dedicated", "value": pool}]})
+    # Pods distribuídos proporcionalmente à CPU do nó, ~60% de ocupação média
+    targets = rng.choices(nodes, weights=[n.cpu for n in nodes], k=pod_count)
+    pods = []
+    for i, node in enumerate(targets):
+        dedicated = node.pool if node.pool in ("infra", "gpu") else None
+        pods.append(Pod("bench/pod-%06d" % i, node.name, rng.choice((0.01, 0.05, 0.1, 0.1, 0.25)),
+                        rng.choice((64, 128, 256, 512, 1024)) * 2.0 ** 20, signatures[dedicated], True, False))
+    return nodes, pods
+
+
+def max_pods_check(backend):
+    """Pool limitado por max-pods (pods mínimos, CPU e memória folgadas): 4 nós de 10 pods com
+    6 pods cada; esvaziar um nó cabe (6 pods em 3x4 vagas), um segundo não (8 pods em 2x2)."""
+    signature = constraint_signature({})
+    nodes = [Node("pods-%d" % i, "pods", 16.0, 64 * 2.0 ** 30, 10, {"node-role.kubernetes.io/worker": ""},
+                  [], True, True) for i in range(4)]
+    pods = [Pod("check/pod-%02d" % i, nodes[i // 6].name, 0.01, 2.0 ** 20, signature, True, False)
+            for i in range(24)]
+    plan, _ = simulate(nodes, pods, 80, 1, backend)
+    removable = sum(p["removable"] for p in plan)
+    if removable != 1:
+        raise SystemExit("max-pods ignorado (%s): %d nós removíveis, esperado 1" % (backend, removable))
+    return removable
+
+
+def benchmark(args):
+    nodes, pods = synthetic_cluster(args.nodes, args.pods)
+    print("Cluster sintético: %d nós, %d pods" % (len(nodes), len(pods)))
+    backends = ["numpy", "python"] if load_numpy() is not None else ["python"]
+    for backend in backends:
+        # Núcleo FFD: todos os pods em nós vazios
+        masks = dict((sig, [node_feasible(n, sig) for n in nodes]) for sig in set(p.signature for p in pods))
+        packer = make_packer([n.cpu for n in nodes], [n.memory for n in nodes], [n.pods for n in nodes], masks, backend)
+        start = time.time()
+        placed = first_fit_decreasing(packer, pods, 16.0, 64 * 2.0 ** 30)
+        ffd = time.time() - start
+        used = len(set(j for _, j in placed)) if placed else 0
+        start = time.time()
+        plan, _ = simulate(nodes, pods, args.max_utilization, args.min_pool_nodes, backend)
+        drain = time.time() - start
+        print("%-6s  FFD (%d pods): %.2fs, %d nós usados | simulação de consolidação: %.2fs, %d nós removíveis"
+              % (backend, len(pods), ffd, used, drain, sum(p["removable"] for p in plan)))
+        print("%-6s  verificação com max-pods como limite: %d nó removível (ok)" % (backend, max_pods_check(backend)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de consolidação de nós (first-fit-decreasing)")
+    parser.add_argument("data_dir", nargs="?")
+    parser.add_argument("--out")
+    parser.add_argument("--max-utilization", type=float, default=80)
+    parser.add_argument("--min-pool-nodes", type=int, default=2)
+    parser.add_argument("--cpu-hour", type=float, default=0.05)
+    parser.add_argument("--memory-gb-hour", type=float, default=0.01)
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--pods", type=int, default=50000)
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args)
+        return
+    if not args.data_dir or not args.out:
+        parser.error("informe <data_collection_dir> e --out (ou --benchmark)")
+    nodes, pods = load_cluster(args.data_dir)
+    summary = summarize(nodes, pods, args)
+    with open(args.out, "w") as fp:
+        json.dump(summary, fp, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
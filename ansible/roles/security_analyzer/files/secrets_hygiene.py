@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Higiene de secrets e configmaps no host remoto, com índice de hashes de conteúdo.
+
+Uso: secrets_hygiene.py <security_configs.json> --index <index.json> --out <resumo.json>
+                        [--pods <pods.json>] [--rbac <rbac.json>]
+                        [--configmap-max-kb 512] [--token-max-age-days 365]
+
+Cada Secret/ConfigMap é reduzido durante o parse (object_hook) a um registro com
+namespace, nome, tipo, tamanho e HMAC-SHA256 do conteúdo; os valores são descartados
+logo após o hash e nunca são gravados. A chave do HMAC é aleatória, por cluster, e fica
+ao lado do índice (<index>.key, modo 0600): sem ela os hashes do índice não servem para
+testar valores offline (senhas e tokens de baixa entropia). O índice (uid ->
+resourceVersion, hash, tamanho), também em modo 0600, é persistido entre execuções:
+objetos com o mesmo resourceVersion reaproveitam o hash. Os relatórios identificam os
+grupos de secrets duplicados pelos nomes dos objetos, nunca pelo hash.
+
+Achados: secrets duplicados entre namespaces, configmaps grandes, secrets não
+referenciados por pods (volumes, env, envFrom, imagePullSecrets) nem por service
+accounts, e tokens legados de service account antigos ou de service accounts removidas.
+Só o resumo (pequeno) vai para o controlador.
+"""
+import argparse
+import datetime
+import hashlib
+import hmac
+import json
+import os
+
+HASHED_KINDS = ("Secret", "ConfigMap")
+# Gerenciados pelo cluster/ferramentas: não entram em duplicados nem em "não usados"
+AUTO_SECRET_TYPES = ("kubernetes.io/service-account-token", "kubernetes.io/dockercfg")
+NOT_POD_SECRET_TYPES = AUTO_SECRET_TYPES + ("kubernetes.io/tls", "helm.sh/release.v1")
+TOKEN_TYPE = "kubernetes.io/service-account-token"
+MAX_LISTED = 50
+# Versão 2: HMAC com chave por cluster (índices da versão 1, SHA-256 puro, são descartados)
+INDEX_VERSION = 2
+KEY_BYTES = 32
+
+
+def parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return None
+
+
+def content_hash(obj, key):
+    digest = hmac.new(key, digestmod=hashlib.sha256)
+    size = 0
+    for section in ("data", "binaryData", "stringData"):
+        values = obj.get(section) or {}
+        for key in sorted(values):
+            value = values[key] if isinstance(values[key], str) else json.dumps(values[key])
+            raw = value.encode("utf-8")
+            size += len(raw)
+            digest.update(section.encode() + b"\0" + key.encode("utf-8") + b"\0" + raw + b"\0")
+    return digest.hexdigest(), size
+
+
+class Scanner(object):
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+        self.records = []
+        self.new_index = {}
+        self.rehashed = 0
+        self.reused = 0
+
+    def hook(self, obj):
+        """object_hook: troca cada Secret/ConfigMap pelo registro sem valores."""
+        if obj.get("kind") not in HASHED_KINDS or not isinstance(obj.get("metadata"), dict):
+            return obj
+        meta = obj["metadata"]
+        uid, rv = meta.get("uid"), meta.get("resourceVersion")
+        cached = self.index.get(uid) if uid else None
+        if cached and cached.get("rv") == rv:
+            digest, size = cached["hash"], cached["size"]
+            self.reused += 1
+        else:
+            digest, size = content_hash(obj, self.key)
+            self.rehashed += 1
+        if uid:
+            self.new_index[uid] = {"rv": rv, "hash": digest, "size": size}
+        annotations = meta.get("annotations") or {}
+        record = {
+            "kind": obj["kind"],
+            "namespace": meta.get("namespace", ""),
+            "name": meta.get("name", ""),
+            "type": obj.get("type", ""),
+            "hash": digest,
+            "size": size,
+            "created": meta.get("creationTimestamp"),
+            "owned": bool(meta.get("ownerReferences")),
+            "service_account": annotations.get("kubernetes.io/service-account.name"),
+        }
+        self.records.append(record)
+        return record
+
+
+class References(object):
+    """Secrets referenciados por pods e service accounts, como (namespace, nome)."""
+
+    def __init__(self):
+        self.secrets = set()
+        self.service_accounts = set()
+        self.pods = 0
+
+    def pod_hook(self, obj):
+        if obj.get("kind") != "Pod" or not isinstance(obj.get("spec"), dict):
+            return obj
+        ns = (obj.get("metadata") or {}).get("namespace", "")
+        spec = obj["spec"]
+        names = [s.get("name") for s in spec.get("imagePullSecrets") or []]
+        for volume in spec.get("volumes") or []:
+            names.append((volume.get("secret") or {}).get("secretName"))
+            for source in (volume.get("projected") or {}).get("sources") or []:
+                names.append((source.get("secret") or {}).get("name"))
+        for container in (spec.get("containers") or []) + (spec.get("initContainers") or []):
+            for env in container.get("env") or []:
+                names.append(((env.get("valueFrom") or {}).get("secretKeyRef") or {}).get("name"))
+            for env_from in container.get("envFrom") or []:
+                names.append((env_from.get("secretRef") or {}).get("name"))
+        self.secrets.update((ns, name) for name in names if name)
+        self.pods += 1
+        return {}
+
+    def sa_hook(self, obj):
+        if obj.get("kind") != "ServiceAccount" or not isinstance(obj.get("metadata"), dict):
+            return obj
+        ns, name = obj["metadata"].get("namespace", ""), obj["metadata"].get("name", "")
+        self.service_accounts.add((ns, name))
+        for ref in (obj.get("secrets") or []) + (obj.get("imagePullSecrets") or []):
+            if ref.get("name"):
+                self.secrets.add((ns, ref["name"]))
+        return {}
+
+
+def load_json(path, hook):
+    try:
+        with open(path) as fp:
+            return json.load(fp, object_hook=hook)
+    except (OSError, ValueError):
+        return None
+
+
+def key_path(index_path):
+    return os.path.splitext(index_path)[0] + ".key"
+
+
+def open_private(path):
+    """Arquivo novo só para o dono (0600), independente do umask."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w")
+
+
+def load_key(path):
+    """Chave do HMAC do cluster; criada na primeira execução. Devolve (chave, nova)."""
+    try:
+        with open(path) as fp:
+            key = bytes.fromhex(fp.read().strip())
+        if len(key) >= KEY_BYTES:
+            return key, False
+    except (OSError, ValueError):
+        pass
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    key = os.urandom(KEY_BYTES)
+    tmp = path + ".tmp"
+    with open_private(tmp) as fp:
+        fp.write(key.hex())
+    os.replace(tmp, path)
+    return key, True
+
+
+def load_index(path):
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("objects", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_index(path, objects):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmp = path + ".tmp"
+    with open_private(tmp) as fp:
+        json.dump({"version": INDEX_VERSION, "objects": objects}, fp, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def ref(record):
+    return "%s/%s" % (record["namespace"], record["name"])
+
+
+def analyze(records, refs, now, configmap_max_kb, token_max_age_days, have_pods, have_sas):
+    secrets = [r for r in records if r["kind"] == "Secret"]
+    configmaps = [r for r in records if r["kind"] == "ConfigMap"]
+    result = {
+        "total_secrets": len(secrets),
+        "total_configmaps": len(configmaps),
+        "secrets_by_namespace": {},
+        "secrets_by_type": {},
+        "duplicated_secrets": [],
+        "oversized_configmaps": [],
+        "unused_secrets": [],
+        "stale_service_account_tokens": [],
+        "issues": [],
+    }
+    for r in secrets:
+        result["secrets_by_namespace"][r["namespace"]] = result["secrets_by_namespace"].get(r["namespace"], 0) + 1
+        result["secrets_by_type"][r["type"]] = result["secrets_by_type"].get(r["type"], 0) + 1
+
+    groups = {}
+    for r in secrets:
+        if r["type"] not in AUTO_SECRET_TYPES and r["size"] > 0:
+            groups.setdefault(r["hash"], []).append(r)
+    duplicated = [g for g in groups.values() if len(set(r["namespace"] for r in g)) > 1]
+    duplicated.sort(key=len, reverse=True)
+    result["duplicated_secrets"] = [{"group": n, "count": len(g),
+                                     "secrets": sorted(ref(r) for r in g)[:MAX_LISTED]}
+                                    for n, g in enumerate(duplicated[:MAX_LISTED], 1)]
+
+    limit = configmap_max_kb * 1024
+    oversized = sorted((r for r in configmaps if r["size"] > limit), key=lambda r: r["size"], reverse=True)
+    result["oversized_configmaps"] = [{"configmap": ref(r), "size_kb": round(r["size"] / 1024.0, 1)}
+                                      for r in oversized[:MAX_LISTED]]
+
+    unused = []
+    if have_pods:
+        unused = [r for r in secrets if r["type"] not in NOT_POD_SECRET_TYPES and not r["owned"]
+                  and (r["namespace"], r["name"]) not in refs.secrets]
+        result["unused_secrets"] = sorted(ref(r) for r in unused)[:MAX_LISTED]
+
+    stale = []
+    for r in secrets:
+        if r["type"] != TOKEN_TYPE:
+            continue
+        created = parse_time(r["created"])
+        age_days = (now - created).days if created else None
+        orphan = have_sas and r["service_account"] and (r["namespace"], r["service_account"]) not in refs.service_accounts
+        if orphan or (age_days is not None and age_days > token_max_age_days):
+            stale.append({"secret": ref(r), "age_days": age_days, "orphan": bool(orphan)})
+    stale.sort(key=lambda s: s["age_days"] or 0, reverse=True)
+    result["stale_service_account_tokens"] = stale[:MAX_LISTED]
+
+    if duplicated:
+        result["issues"].append("%d secrets com conteúdo idêntico em múltiplos namespaces (%d grupos)"
+                                % (sum(len(g) for g in duplicated), len(duplicated)))
+    if oversized:
+        result["issues"].append("%d configmaps acima de %d KB" % (len(oversized), configmap_max_kb))
+    if unused:
+        result["issues"].append("%d secrets não referenciados por pods nem service accounts" % len(unused))
+    if stale:
+        result["issues"].append("%d tokens legados de service account com mais de %d dias ou sem service account"
+                                % (len(stale), token_max_age_days))
+    result["counts"] = {"duplicated_secrets": sum(len(g) for g in duplicated),
+                        "oversized_configmaps": len(oversized), "unused_secrets": len(unused),
+                        "stale_service_account_tokens": len(stale)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Higiene de secrets e configmaps (somente hashes)")
+    parser.add_argument("security_configs")
+    parser.add_argument("--index", required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--pods")
+    parser.add_argument("--rbac")
+    parser.add_argument("--configmap-max-kb", type=int, default=512)
+    parser.add_argument("--token-max-age-days", type=int, default=365)
+    args = parser.parse_args()
+
+    key, new_key = load_key(key_path(args.index))
+    # Chave nova: hashes do índice anterior (outra chave ou sem chave) não se comparam
+    scanner = Scanner({} if new_key else load_index(args.index), key)
+    data = load_json(args.security_configs, scanner.hook) or {}
+    refs = References()
+    have_pods = bool(args.pods) and load_json(args.pods, refs.pod_hook) is not None
+    have_sas = bool(args.rbac) and load_json(args.rbac, refs.sa_hook) is not None and bool(refs.service_accounts)
+
+    # Referência de tempo = momento da coleta (resultado reproduzível ao reprocessar os dados)
+    collected = parse_time((data.get("collection_metadata") or {}).get("collection_timestamp"))
+    now = collected or datetime.datetime.utcnow()
+    result = analyze(scanner.records, refs, now, args.configmap_max_kb, args.token_max_age_days,
+                     have_pods, have_sas)
+    result["index"] = {"rehashed": scanner.rehashed, "reused": scanner.reused, "pods_scanned": refs.pods}
+    save_index(args.index, scanner.new_index)
+    with open(args.out, "w") as fp:
+        json.dump(result, fp, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,10 @@ TAGS=""
 VERBOSE=""
 DRY_RUN=""
 CHECK_ONLY=""
+NAMESPACES=""
+SELECTOR=""
+WATCH=""
+REPLAY=""
 
 # Função para exibir uso
 usage() {
@@ -36,6 +40,11 @@ usage() {
     echo "  -t, --token TOKEN          Token de autenticação OpenShift (obrigatório)"
     echo "  -k, --kubeconfig CAMINHO   Caminho para arquivo kubeconfig (opcional)"
     echo "  --tags TAGS                Lista separada por vírgulas de tags para executar"
+    echo "  -n, --namespaces LISTA     Modo direcionado: namespaces separados por vírgula"
+    echo "  -l, --selector SELETOR     Modo direcionado: label selector dos namespaces (ex.: team=pagamentos)"
+    echo "  --watch                    Após a execução, manter o modo contínuo (watch) no bastion"
+    echo "  --watch-stop               Parar o modo contínuo em execução no bastion"
+    echo "  --replay SNAPSHOT          Replay offline: analisar um data_collection/ (ou .tar.gz) já coletado, sem acessar o cluster"
     echo "  -v, --verbose              Habilitar saída verbosa"
     echo "  --check                    Executar em modo de verificação (dry run)"
     echo "  --diff                     Mostrar diferenças quando arquivos são alterados"
@@ -45,6 +54,8 @@ usage() {
     echo "  $0 -u https://api.cluster.example.com:6443 -t sha256~abc123..."
     echo "  $0 -u https://api.cluster.example.com:6443 -t sha256~abc123... --tags seguranca"
     echo "  $0 -u https://api.cluster.example.com:6443 -t sha256~abc123... --check"
+    echo "  $0 -u https://api.cluster.example.com:6443 -t sha256~abc123... -n app-prod,app-hml"
+    echo "  $0 --replay ../reports/production-cluster_20241215_143022"
     echo ""
     echo "Tags disponíveis:"
     echo "  coleta_dados      - Coletar dados do cluster OpenShift"
@@ -53,6 +64,7 @@ usage() {
     echo "  boas_praticas     - Analisar conformidade com boas práticas"
     echo "  recursos          - Analisar otimização de recursos"
     echo "  relatorios        - Gerar relatórios"
+    echo "  watch             - Gerenciar o modo contínuo (com --watch/--watch-stop)"
     echo "  todos             - Executar todas as análises (padrão)"
 }
 
@@ -95,6 +107,27 @@ while [[ $# -gt 0 ]]; do
             TAGS="$2"
             shift 2
             ;;
+        -n|--namespaces)
+            NAMESPACES="$2"
+            shift 2
+            ;;
+        -l|--selector)
+            SELECTOR="$2"
+            shift 2
+            ;;
+        --watch)
+            WATCH="started"
+            shift
+            ;;
+        --watch-stop)
+            WATCH="stopped"
+            TAGS="watch"
+            shift
+            ;;
+        --replay)
+            REPLAY="$2"
+            shift 2
+            ;;
         -v|--verbose)
             VERBOSE="-v"
             shift
@@ -119,6 +152,38 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+# Replay offline: sem cluster, credenciais ou CLI; só o snapshot
+if [[ -n "$REPLAY" ]]; then
+    if [[ ! -e "$REPLAY" ]]; then
+        log_error "Snapshot não encontrado: $REPLAY"
+        exit 1
+    fi
+    if ! command -v ansible-playbook &> /dev/null; then
+        log_error "Ansible não está instalado. Por favor, instale o Ansible primeiro."
+        exit 1
+    fi
+    REPLAY="$(cd "$(dirname "$REPLAY")" && pwd)/$(basename "$REPLAY")"
+    # Mesmo diretório passado ao playbook e usado abaixo para localizar a execução
+    REPLAY_OUTPUT_DIR="$(cd "${ANSIBLE_DIR}/.." && pwd)/reports"
+    mkdir -p "$REPLAY_OUTPUT_DIR"
+    cd "$ANSIBLE_DIR"
+    ANSIBLE_CMD="ansible-playbook -i inventory/hosts.yml playbooks/openshift_health_check_replay.yml"
+    ANSIBLE_CMD="$ANSIBLE_CMD -e replay_from='$REPLAY' -e output_dir='$REPLAY_OUTPUT_DIR' --tags '${TAGS:-todos}' $VERBOSE"
+    log "Replay offline de: $REPLAY"
+    log "Executando: $ANSIBLE_CMD"
+    START=$(date +%s)
+    if eval "$ANSIBLE_CMD"; then
+        log_success "Replay concluído em $(( $(date +%s) - START ))s"
+        LATEST_REPLAY=$(ls -td "$REPLAY_OUTPUT_DIR"/replay/*_[0-9]*T[0-9]*/ 2>/dev/null | head -1)
+        if [[ -n "$LATEST_REPLAY" ]]; then
+            log_success "Relatórios gerados em: $LATEST_REPLAY"
+        fi
+        exit 0
+    fi
+    log_error "Replay falhou!"
+    exit 1
+fi
+
 # Validar parâmetros obrigatórios
 if [[ -z "$CLUSTER_URL" ]]; then
     log_error "URL do cluster é obrigatória. Use a opção -u ou --url."
@@ -164,6 +229,9 @@ log "Iniciando Avaliação de Saúde do OpenShift..."
 log "URL do Cluster: $CLUSTER_URL"
 log "Kubeconfig: $KUBECONFIG_PATH"
 log "Tags: $TAGS"
+if [[ -n "$NAMESPACES" || -n "$SELECTOR" ]]; then
+    log "Modo direcionado: namespaces='$NAMESPACES' selector='$SELECTOR'"
+fi
 
 # Build ansible-playbook command
 ANSIBLE_CMD="ansible-playbook"
@@ -174,6 +242,18 @@ ANSIBLE_CMD="$ANSIBLE_CMD -e cluster_token='$CLUSTER_TOKEN'"
 ANSIBLE_CMD="$ANSIBLE_CMD -e kubeconfig_path='$KUBECONFIG_PATH'"
 ANSIBLE_CMD="$ANSIBLE_CMD --tags '$TAGS'"
 
+if [[ -n "$NAMESPACES" ]]; then
+    ANSIBLE_CMD="$ANSIBLE_CMD -e namespace_filter='$NAMESPACES'"
+fi
+
+if [[ -n "$SELECTOR" ]]; then
+    ANSIBLE_CMD="$ANSIBLE_CMD -e label_selector='$SELECTOR'"
+fi
+
+if [[ -n "$WATCH" ]]; then
+    ANSIBLE_CMD="$ANSIBLE_CMD -e watch_mode=true -e watch_state=$WATCH"
+fi
+
 if [[ -n "$VERBOSE" ]]; then
     ANSIBLE_CMD="$ANSIBLE_CMD $VERBOSE"
 fi
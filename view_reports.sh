@@ -14,6 +14,7 @@ NC='\033[0m' # Sem Cor
 # Diretório do script
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPORTS_DIR="${SCRIPT_DIR}/reports"
+TREND_STORE="${SCRIPT_DIR}/ansible/roles/report_generator/files/trend_store.py"
 
 # Função para exibir uso
 usage() {
@@ -26,6 +27,8 @@ usage() {
     echo "  -e, --execution ID      Especificar ID da execução"
     echo "  -a, --all               Abrir todos os relatórios"
     echo "  -c, --consolidated      Abrir apenas relatório consolidado"
+    echo "  -t, --trends            Mostrar o que mudou desde a execução anterior (histórico SQLite)"
+    echo "  -s, --since PERÍODO     Base de comparação para --trends: last (padrão), 7d, 30d ou AAAA-MM-DD"
     echo "  -h, --help              Mostrar esta mensagem de ajuda"
     echo ""
     echo "Exemplos:"
@@ -33,6 +36,7 @@ usage() {
     echo "  $0 -e demo-cluster_20250923_155944  # Abrir relatórios de execução específica"
     echo "  $0 -a                   # Abrir todos os relatórios da execução mais recente"
     echo "  $0 -c                   # Abrir apenas relatório consolidado da execução mais recente"
+    echo "  $0 -t -s 7d             # O que mudou na última semana no cluster da execução mais recente"
 }
 
 # Função para listar execuções disponíveis
@@ -152,11 +156,25 @@ show_execution_info() {
     echo ""
 }
 
+# Função para exibir tendências do cluster da execução (ingestão incremental + diff)
+show_trends() {
+    local execution_id="$1"
+    local since="$2"
+    local cluster_name
+    cluster_name=$(echo "$execution_id" | sed -E 's/_[0-9]{8}[T_][0-9]{6}$//')
+
+    echo -e "${BLUE}Tendências do cluster: $cluster_name (base: $since)${NC}"
+    python3 "$TREND_STORE" ingest "$REPORTS_DIR" >/dev/null
+    python3 "$TREND_STORE" diff "$REPORTS_DIR" --cluster "$cluster_name" --since "$since"
+}
+
 # Parse command line arguments
 EXECUTION_ID=""
 LIST_ONLY=false
 OPEN_ALL=false
 OPEN_CONSOLIDATED=false
+SHOW_TRENDS=false
+TRENDS_SINCE="last"
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -176,6 +194,14 @@ while [[ $# -gt 0 ]]; do
             OPEN_CONSOLIDATED=true
             shift
             ;;
+        -t|--trends)
+            SHOW_TRENDS=true
+            shift
+            ;;
+        -s|--since)
+            TRENDS_SINCE="$2"
+            shift 2
+            ;;
         -h|--help)
             usage
             exit 0
@@ -208,6 +234,11 @@ fi
 # Mostrar informações da execução
 show_execution_info "$EXECUTION_ID"
 
+if [ "$SHOW_TRENDS" = true ]; then
+    show_trends "$EXECUTION_ID" "$TRENDS_SINCE"
+    exit 0
+fi
+
 # Executar ação solicitada
 if [ "$OPEN_ALL" = true ]; then
     open_all_reports "$EXECUTION_ID"